@@ -33,6 +33,7 @@ interface ScrapeResponse {
 interface EventsResponse {
   status: string
   data: ScrapedEvent[]
+  next_cursor?: string | null
 }
 
 interface FilterParams {
@@ -46,6 +47,7 @@ interface FilterParams {
 export function ScrapedDataPage() {
   const [events, setEvents] = useState<ScrapedEvent[]>([])
   const [loading, setLoading] = useState(false)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [error, setError] = useState<string | null>(null)
   const [success, setSuccess] = useState<string | null>(null)
   const [filters, setFilters] = useState<FilterParams>({})
@@ -70,8 +72,9 @@ export function ScrapedDataPage() {
     }
   }, [events])
 
-  // Function to fetch events from database with filters
-  const fetchEvents = async (filterParams: FilterParams = {}) => {
+  // Function to fetch events from database with filters; with a cursor the
+  // next page is appended to the events already shown
+  const fetchEvents = async (filterParams: FilterParams = {}, cursor: string | null = null) => {
     try {
       setLoading(true)
       setError(null)
@@ -105,17 +108,26 @@ export function ScrapedDataPage() {
         })
       }
       
+      // Results are paginated; one page is loaded per request
+      if (cursor) {
+        params.append('cursor', cursor)
+      }
+      
       const url = `${api}/events${params.toString() ? `?${params}` : ''}`
       const response = await axios.get<EventsResponse>(url)
       
-      if (response.data && response.data.status === "success" && Array.isArray(response.data.data)) {
-        setEvents(response.data.data)
-        setSuccess(`Successfully loaded ${response.data.data.length} events from database`)
-      } else {
+      if (!(response.data && response.data.status === "success" && Array.isArray(response.data.data))) {
         setEvents([]) // Set to empty array if data is invalid
+        setNextCursor(null)
         setError("Invalid response format from server")
         console.error("Invalid response format:", response.data)
+        return
       }
+      
+      const page = response.data.data
+      setEvents(previous => (cursor ? [...previous, ...page] : page))
+      setNextCursor(response.data.next_cursor ?? null)
+      setSuccess(`Successfully loaded ${page.length} events from database`)
     } catch (err) {
       console.error("Error fetching events from database:", err)
       setError("Failed to load events. Please try again.")
@@ -135,6 +147,7 @@ export function ScrapedDataPage() {
       // Check if response.data.data exists and is an array before setting events
       if (response.data && response.data.data && Array.isArray(response.data.data)) {
         setEvents(response.data.data)
+        setNextCursor(null)
         
         const message = `Successfully retrieved ${response.data.data.length} events (${response.data.db_result.created} new, ${response.data.db_result.updated} updated)`
         setSuccess(message)
@@ -416,7 +429,7 @@ export function ScrapedDataPage() {
         ) : (
           <Card className="border-border/30 shadow-card overflow-hidden">
             <CardHeader className="bg-card px-6 py-4 border-b border-border/30 text-black">
-              <CardTitle>Forex Economic Events ({events.length})</CardTitle>
+              <CardTitle>Forex Economic Events ({events.length}{nextCursor ? "+" : ""})</CardTitle>
             </CardHeader>
             <div className="overflow-x-auto">
               <table className="w-full">
@@ -480,6 +493,18 @@ export function ScrapedDataPage() {
                 </tbody>
               </table>
             </div>
+            {nextCursor && (
+              <div className="flex justify-center px-6 py-4 border-t border-border/30">
+                <Button
+                  onClick={() => fetchEvents(filters, nextCursor)}
+                  variant="outline"
+                  disabled={loading}
+                >
+                  <RefreshCw className={`h-4 w-4 mr-2 ${loading ? "animate-spin" : ""}`} />
+                  Load More
+                </Button>
+              </div>
+            )}
           </Card>
         )}
       </div>
@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react"
+import { useState, useEffect, useRef } from "react"
 import axios from "axios"
 import { Button } from "@/components/ui/button"
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card"
@@ -62,6 +62,8 @@ export function WeeklySignalsPage() {
   const [generating, setGenerating] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [success, setSuccess] = useState<string | null>(null);
+  const [phase, setPhase] = useState<string | null>(null);
+  const generationRef = useRef<EventSource | null>(null);
   const api = import.meta.env.VITE_API_URL
   
   // Initialize the week dates
@@ -113,51 +115,82 @@ export function WeeklySignalsPage() {
     }
   };
   
-  // Generate new signals for the selected date
-  const generateSignals = async () => {
-    try {
-      setGenerating(true);
-      setError(null);
-      setSuccess(null);
-      
-      console.log("Attempting to generate signals from:", `${api}/generate-signals`);
-      
-      const response = await axios.get<GenerateResponse>(
-        `${api}/generate-signals`,
-      );
-      
-      console.log("Raw API response:", response);
-      console.log("Generated signals data:", response.data);
-      
-      if (response.data.status === "success") {
-        // Convert the generated signals to the expected format
-        const newSignalData: SignalData = {
-          _id: new Date().toISOString(),
-          market_summary: response.data.signals.market_summary,
-          signals: response.data.signals.signals,
-          date: response.data.signals.date,
-          timestamp: response.data.signals.timestamp,
-          createdAt: new Date().toISOString(),
-          updatedAt: new Date().toISOString()
-        };
-        
-        setSignalsData(newSignalData);
-        setSuccess("Successfully generated new signals for the selected date.");
-      } else {
-        console.error("API returned non-success status:", response.data);
-        setError("Failed to generate signals. Please try again.");
-      }
-    } catch (err) {
-      console.error("Error generating signals:", err);
-      if (axios.isAxiosError(err)) {
-        console.error("Axios error details:", err.response?.data);
-        setError(`Error occurred: ${err.message}. ${err.response?.data?.message || ''}`);
+  // Close a running generation stream (cancels the run on the server)
+  const stopGeneration = () => {
+    generationRef.current?.close();
+    generationRef.current = null;
+    setGenerating(false);
+    setPhase(null);
+  };
+  
+  useEffect(() => () => generationRef.current?.close(), []);
+  
+  // Generate new signals for the selected date, showing progress and signals as they arrive
+  const generateSignals = () => {
+    if (generating) {
+      stopGeneration();
+      setError("Signal generation cancelled.");
+      return;
+    }
+    
+    setGenerating(true);
+    setError(null);
+    setSuccess(null);
+    setPhase("Loading events...");
+    
+    console.log("Attempting to generate signals from:", `${api}/generate-signals/stream`);
+    const source = new EventSource(`${api}/generate-signals/stream`);
+    generationRef.current = source;
+    const data = (event: Event) => JSON.parse((event as MessageEvent).data);
+    
+    source.addEventListener("events_loaded", (event) => {
+      const { changed_events } = data(event);
+      setPhase(`Analyzing ${changed_events} events...`);
+    });
+    source.addEventListener("prompt_built", () => setPhase("Waiting for AI..."));
+    source.addEventListener("tokens", (event) => {
+      const { chars } = data(event);
+      setPhase(`Receiving (${chars} chars)...`);
+    });
+    source.addEventListener("signal", (event) => {
+      const { signal } = data(event) as { signal: Signal };
+      setSignalsData((current) => {
+        const now = new Date().toISOString();
+        // Signals of a previous set are replaced as soon as the first new one arrives
+        const base: SignalData = current && current._id === "streaming"
+          ? current
+          : { _id: "streaming", market_summary: "", signals: [], date: selectedDate, timestamp: now, createdAt: now, updatedAt: now };
+        return { ...base, signals: [...base.signals, signal] };
+      });
+    });
+    source.addEventListener("persisted", () => setPhase("Saving..."));
+    source.addEventListener("done", (event) => {
+      const result = data(event) as Pick<GenerateResponse, "status" | "signals"> & { truncated?: boolean };
+      console.log("Generated signals data:", result);
+      const now = new Date().toISOString();
+      setSignalsData({
+        _id: now,
+        market_summary: result.signals.market_summary,
+        signals: result.signals.signals,
+        date: result.signals.date,
+        timestamp: result.signals.timestamp,
+        createdAt: now,
+        updatedAt: now
+      });
+      if (result.truncated) {
+        setError("The AI response was cut off. Showing the complete signals; they were not saved.");
       } else {
-        setError("Error occurred while generating signals.");
+        setSuccess("Successfully generated new signals for the selected date.");
       }
-    } finally {
-      setGenerating(false);
-    }
+      stopGeneration();
+    });
+    // Fired both for the server's error event (with data) and for connection errors (without)
+    source.addEventListener("error", (event) => {
+      const message = (event as MessageEvent).data ? data(event).message : "Connection to the server was lost.";
+      console.error("Error generating signals:", event);
+      setError(`Failed to generate signals. ${message}`);
+      stopGeneration();
+    });
   };
   
   // Handle date change from the calendar
@@ -240,7 +273,6 @@ export function WeeklySignalsPage() {
 
           <Button 
             onClick={generateSignals} 
-            disabled={generating}
             className="bg-primary text-primary-foreground hover:bg-primary/90"
           >
             {generating ? (
@@ -248,7 +280,7 @@ export function WeeklySignalsPage() {
             ) : (
               <CalendarIcon className="mr-2 h-4 w-4" />
             )}
-            {generating ? "Generating..." : "Generate Signals"}
+            {generating ? `${phase ?? "Generating..."} Cancel` : "Generate Signals"}
           </Button>
         </div>
       </div>
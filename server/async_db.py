@@ -0,0 +1,91 @@
+"""
+Non-blocking access to the pymongo-backed DB classes for the FastAPI handlers.
+
+pymongo is synchronous, so every public method of the wrapped DB object is
+exposed as a coroutine that runs the blocking call in a dedicated thread pool.
+The event loop stays free to serve other requests while a query is in flight.
+"""
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from db import EconomicCalendarDB, LLMResponseCacheDB, SignalDB
+
+# Number of threads available for concurrent Mongo calls; keep it at or below
+# the MongoClient connection pool size
+DB_THREAD_POOL_SIZE = int(os.getenv("DB_THREAD_POOL_SIZE", "16"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Return the thread pool shared by all async DB wrappers."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=DB_THREAD_POOL_SIZE, thread_name_prefix="mongo")
+    return _executor
+
+
+async def shutdown_db_executor() -> None:
+    """Stop the DB thread pool (called on application shutdown), waiting for in-flight calls off the event loop."""
+    global _executor
+    executor, _executor = _executor, None
+    if executor is not None:
+        await asyncio.get_running_loop().run_in_executor(None, functools.partial(executor.shutdown, wait=True))
+
+
+class AsyncDB:
+    """
+    Wrap a synchronous DB object so its public methods can be awaited.
+
+    Attributes that are not public methods (collections, counters, ...) are
+    passed through unchanged, and the blocking object stays available as
+    `sync` for code that already runs in a worker thread.
+    """
+
+    def __init__(self, sync_db: Any, executor: Optional[ThreadPoolExecutor] = None):
+        self.sync = sync_db
+        self._executor = executor
+
+    async def run(self, fn, *args, **kwargs):
+        """Run a blocking callable in the DB thread pool."""
+        loop = asyncio.get_running_loop()
+        executor = self._executor or get_db_executor()
+        return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.sync, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def method(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+
+        return method
+
+
+class AsyncEconomicCalendarDB(AsyncDB):
+    """Awaitable version of EconomicCalendarDB with the same methods."""
+
+    def __init__(self, sync_db: Optional[EconomicCalendarDB] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        super().__init__(sync_db if sync_db is not None else EconomicCalendarDB(), executor)
+
+
+class AsyncSignalDB(AsyncDB):
+    """Awaitable version of SignalDB with the same methods."""
+
+    def __init__(self, sync_db: Optional[SignalDB] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        super().__init__(sync_db if sync_db is not None else SignalDB(), executor)
+
+
+class AsyncLLMResponseCacheDB(AsyncDB):
+    """Awaitable version of LLMResponseCacheDB with the same methods."""
+
+    def __init__(self, sync_db: Optional[LLMResponseCacheDB] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        super().__init__(sync_db if sync_db is not None else LLMResponseCacheDB(), executor)
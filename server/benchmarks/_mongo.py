@@ -0,0 +1,75 @@
+"""
+Shared Mongo helpers for the benchmark scripts.
+
+Benchmarks run against a local mongod when one is reachable and fall back
+to mongomock otherwise. A fixed round-trip delay can be injected on the mock
+so that chatty access patterns cost roughly what they would over a network.
+"""
+import os
+import sys
+import time
+
+# Make the server modules importable when running `python benchmarks/<script>.py`
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+# Collection methods that cost one round trip each on a real server
+ROUND_TRIP_METHODS = {
+    "find", "insert_one", "insert_many", "update_one", "update_many", "bulk_write",
+    "find_one", "count_documents", "estimated_document_count", "aggregate",
+    "delete_many", "create_index", "list_indexes",
+}
+
+
+class LatencyCollection:
+    """Proxy that sleeps for a fixed round-trip time before each server call."""
+    
+    def __init__(self, collection, rtt_ms: float):
+        self._collection = collection
+        self._rtt = rtt_ms / 1000.0
+    
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name not in ROUND_TRIP_METHODS or not callable(attr):
+            return attr
+        
+        def call(*args, **kwargs):
+            time.sleep(self._rtt)
+            return attr(*args, **kwargs)
+        return call
+
+
+def get_mongo_client(uri: str = "mongodb://localhost:27017", timeout_ms: int = 500):
+    """
+    Return (client, backend_name) for a reachable mongod, or a mongomock client.
+    """
+    try:
+        from pymongo import MongoClient
+        client = MongoClient(uri, serverSelectionTimeoutMS=timeout_ms)
+        client.admin.command("ping")
+        return client, "mongod"
+    except Exception:
+        import mongomock
+        return mongomock.MongoClient(), "mongomock"
+
+
+def make_events(count: int, day: str = "2025-04-21"):
+    """Generate synthetic scraped events shaped like the parser output."""
+    countries = ["USD", "EUR", "GBP", "JPY", "AUD", "CAD", "CHF", "NZD", "CNY"]
+    impacts = ["high", "medium", "low"]
+    events = []
+    for i in range(count):
+        hour, minute = divmod(i % (24 * 4) * 15, 60)
+        events.append({
+            "date": day,
+            "time": f"{hour:02d}:{minute:02d}",
+            "country": countries[i % len(countries)],
+            "event": f"Indicator {i}",
+            "impact": impacts[i % len(impacts)],
+            "actual": f"{(i % 7) * 0.1:.1f}%",
+            "forecast": f"{(i % 5) * 0.1:.1f}%",
+            "previous": f"{(i % 3) * 0.1:.1f}%",
+            "source": "CashbackForex" if i % 2 else "ForexFactory",
+        })
+    return events
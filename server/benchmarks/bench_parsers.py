@@ -0,0 +1,116 @@
+"""
+Benchmark the HTML parser backends over the saved calendar fixtures.
+
+Usage:
+    python benchmarks/bench_parsers.py [--repeat 20] [--backends bs4,lxml,lxml-stream,selectolax]
+
+Each backend runs in its own subprocess so that peak RSS is not shared.
+Reports rows/sec, peak RSS growth while parsing and whether the backend's
+output is identical to the bs4 reference backend.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import _mongo  # noqa: F401  (puts the server directory on sys.path)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURES = {
+    "cashbackforex": ("cashbackforex_week.html", "parse_cashback_forex"),
+    "forexfactory": ("forexfactory_week.html", "parse_forex_factory"),
+}
+
+
+def load_fixture(name):
+    filename, method = FIXTURES[name]
+    with open(os.path.join(FIXTURES_DIR, filename), encoding="utf-8") as f:
+        return f.read(), method
+
+
+class StreamingBackend:
+    name = "lxml-stream"
+
+    def __init__(self, cashback_rows, forex_factory_rows):
+        self.parse_cashback_forex = lambda content: list(cashback_rows(content))
+        self.parse_forex_factory = lambda content: list(forex_factory_rows(content))
+
+
+def run_child(backend_name, repeat):
+    """Measure one backend and print a JSON result line."""
+    import contextlib
+    import io
+    from parsers import get_parser_backend, iter_cashback_forex_rows, iter_forex_factory_rows
+
+    if backend_name == "lxml-stream":
+        # Row-by-row pull parsing; materialized into a list only for comparison
+        backend = StreamingBackend(iter_cashback_forex_rows, iter_forex_factory_rows)
+    else:
+        backend = get_parser_backend(backend_name)
+    reference = get_parser_backend("bs4")
+    results = {"backend": backend.name}
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    for name in FIXTURES:
+        content, method = load_fixture(name)
+        # Silence the parsers' per-row diagnostics
+        with contextlib.redirect_stdout(io.StringIO()):
+            events = getattr(backend, method)(content)
+            identical = events == getattr(reference, method)(content)
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                getattr(backend, method)(content)
+            elapsed = time.perf_counter() - start
+
+            # Separate traced run: tracemalloc slows pure-Python parsing a lot
+            tracemalloc.start()
+            getattr(backend, method)(content)
+            _, py_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        results[name] = {
+            "rows": len(events),
+            "rows_per_sec": len(events) * repeat / elapsed,
+            "ms_per_page": elapsed / repeat * 1000,
+            "python_peak_kb": py_peak / 1024,
+            "identical": identical,
+        }
+
+    # ru_maxrss is reported in KB on Linux
+    results["rss_growth_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backends", default="bs4,lxml,lxml-stream,selectolax")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.repeat)
+        return
+
+    print(f"{'backend':<11} {'page':<14} {'rows':>5} {'rows/s':>10} {'ms/page':>8} "
+          f"{'py peak KB':>10} {'identical':>9}")
+    for backend in args.backends.split(","):
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", backend, "--repeat", str(args.repeat)],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        for name in FIXTURES:
+            r = result[name]
+            print(f"{result['backend']:<11} {name:<14} {r['rows']:>5} {r['rows_per_sec']:>10.0f} "
+                  f"{r['ms_per_page']:>8.1f} {r['python_peak_kb']:>10.0f} {str(r['identical']):>9}")
+        print(f"{'':<11} peak RSS growth: {result['rss_growth_kb']} KB")
+
+
+if __name__ == "__main__":
+    main()
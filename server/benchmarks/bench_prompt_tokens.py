@@ -0,0 +1,99 @@
+"""
+Compare the prompt size of the old JSON event encoding and the compact table.
+
+Usage:
+    python benchmarks/bench_prompt_tokens.py
+
+Days are the recorded days of the saved calendar fixtures (CashbackForex and
+ForexFactory rows grouped by their calendar date), read with the production
+SOURCE_TIMEZONES. The saving is split into its two parts:
+
+old:      build_signal_prompt with the events as json.dumps(indent=2)
+deduped:  the same JSON encoding of dedupe_events output (cross-source
+          duplicates merged, times in UTC)
+compact:  build_signal_prompt with encode_events_table (what it does now)
+
+"dedupe" is the saving of deduped over old and "table" that of compact over
+deduped. The two fixtures were recorded in different weeks, so they share no
+release and cross-source dedupe saves nothing on them; what it saves on a
+real day depends on how many releases both sources list.
+
+Tokens are counted with tiktoken (o200k_base) when it is installed, and
+estimated from words and punctuation otherwise.
+"""
+import argparse
+import contextlib
+import io
+import json
+import re
+
+import _mongo  # noqa: F401  (puts the server directory on sys.path)
+
+from bench_parsers import FIXTURES, load_fixture
+
+import signal_generator
+from parsers import get_parser_backend
+from utils.compactEvents import dedupe_events
+
+
+def token_counter():
+    try:
+        import tiktoken
+    except ImportError:
+        # Rough BPE stand-in: words, numbers and single punctuation marks
+        pattern = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+        return "estimated", lambda text: len(pattern.findall(text))
+    encoding = tiktoken.get_encoding("o200k_base")
+    return "tiktoken o200k_base", lambda text: len(encoding.encode(text))
+
+
+def load_days():
+    """Return [(date, events)] with one entry per recorded calendar date."""
+    backend = get_parser_backend("bs4")
+    days = {}
+    for name in FIXTURES:
+        content, method = load_fixture(name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            rows = getattr(backend, method)(content)
+        for row in rows:
+            days.setdefault(row["date"], []).append(row)
+    return [(date, days[date]) for date in sorted(days)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.parse_args()
+
+    counter_name, count_tokens = token_counter()
+    compact_encoder = signal_generator.encode_events_table
+
+    def json_encoder(events):
+        return "    " + json.dumps(events, indent=2)
+
+    def prompt_tokens(events, encoder):
+        signal_generator.encode_events_table = encoder
+        try:
+            return count_tokens(signal_generator.build_signal_prompt(events))
+        finally:
+            signal_generator.encode_events_table = compact_encoder
+
+    def saved(before, after):
+        return f"{1 - after / before:.0%}"
+
+    print(f"tokens: {counter_name}")
+    print(f"{'day':<11} {'events':>6} {'unique':>6} {'old tok':>7} {'deduped':>7} {'compact':>7} "
+          f"{'dedupe':>6} {'table':>6} {'total':>6}")
+    totals = [0, 0, 0]
+    for date, events in load_days():
+        unique = dedupe_events(events)
+        tokens = [prompt_tokens(events, json_encoder), prompt_tokens(unique, json_encoder),
+                  prompt_tokens(events, compact_encoder)]
+        totals = [total + count for total, count in zip(totals, tokens)]
+        print(f"{date:<11} {len(events):>6} {len(unique):>6} {tokens[0]:>7} {tokens[1]:>7} {tokens[2]:>7} "
+              f"{saved(tokens[0], tokens[1]):>6} {saved(tokens[1], tokens[2]):>6} {saved(tokens[0], tokens[2]):>6}")
+    print(f"{'total':<11} {'':>6} {'':>6} {totals[0]:>7} {totals[1]:>7} {totals[2]:>7} "
+          f"{saved(totals[0], totals[1]):>6} {saved(totals[1], totals[2]):>6} {saved(totals[0], totals[2]):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Compare the per-document and bulk_write paths of EconomicCalendarDB.save_events.
+
+Usage:
+    python benchmarks/bench_save_events.py [--events 700] [--batch-size 500] [--rtt-ms 2]
+
+Uses a local mongod when available, otherwise mongomock with an injected
+round-trip delay (--rtt-ms) so that the number of server calls dominates.
+"""
+import argparse
+import time
+
+from _mongo import LatencyCollection, get_mongo_client, make_events
+
+import db as db_module
+
+
+def run(label, calendar_db, events, **kwargs):
+    calendar_db.events.delete_many({})
+    calendar_db._fingerprints.clear()
+    
+    start = time.perf_counter()
+    inserted = calendar_db.save_events(events, **kwargs)
+    insert_time = time.perf_counter() - start
+    
+    # Second pass over the same scrape with changed values exercises updates
+    for event in events:
+        event["actual"] = (event["actual"] or "") + "1"
+    start = time.perf_counter()
+    updated = calendar_db.save_events(events, **kwargs)
+    update_time = time.perf_counter() - start
+    
+    # Re-scraping identical rows should be skipped by the fingerprint cache
+    start = time.perf_counter()
+    unchanged = calendar_db.save_events(events, **kwargs)
+    unchanged_time = time.perf_counter() - start
+    
+    print(f"{label:<12} insert {insert_time * 1000:8.1f} ms {inserted}")
+    print(f"{'':<12} update {update_time * 1000:8.1f} ms {updated}")
+    print(f"{'':<12} rescrape {unchanged_time * 1000:6.1f} ms {unchanged}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=700)
+    parser.add_argument("--batch-size", type=int, default=db_module.SAVE_EVENTS_BATCH_SIZE)
+    parser.add_argument("--rtt-ms", type=float, default=2.0,
+                        help="Simulated round trip per call (mongomock only)")
+    args = parser.parse_args()
+    
+    client, backend = get_mongo_client()
+    print(f"Backend: {backend}, events: {args.events}, batch size: {args.batch_size}")
+    
+    calendar_db = db_module.EconomicCalendarDB(db=client["bench_forex_scraper"])
+    if backend == "mongomock":
+        calendar_db.events = LatencyCollection(calendar_db.events, args.rtt_ms)
+    
+    run("per-document", calendar_db, make_events(args.events), bulk=False)
+    run("bulk", calendar_db, make_events(args.events), batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Compare the old and new serialization paths of the /events handler.
+
+Usage:
+    python benchmarks/bench_serialization.py [--events 10000] [--repeat 5]
+
+old:        full documents -> JSONEncoder().encode -> json.loads -> transform
+            -> jsonable_encoder -> JSONResponse.render (what FastAPI did)
+direct:     full documents -> transform -> serialization.dumps
+projected:  documents projected to the fields the response needs -> transform
+            -> serialization.dumps (what /events does now)
+
+"Full" documents are what the old {"sourceData": 0} projection returned,
+built with EconomicCalendarDB._build_event_document so they carry the same
+ObjectId/datetime fields as the stored ones. Their BSON size is reported
+next to the projected documents', since the projection mostly saves
+transfer from Mongo.
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+
+import bson
+import mongomock
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from _mongo import make_events
+
+import serialization
+from db import EconomicCalendarDB, JSONEncoder
+from utils.transformEvents import EVENT_FIELDS, transform_economic_events
+
+
+def make_documents(count):
+    calendar_db = EconomicCalendarDB(db=mongomock.MongoClient()["bench_forex_scraper"])
+    documents = []
+    for event in make_events(count):
+        document = calendar_db._build_event_document(event)
+        document["_id"] = ObjectId()
+        document["createdAt"] = datetime.now()
+        del document["sourceData"]
+        documents.append(document)
+    return documents
+
+
+def old_path(documents):
+    events_data = json.loads(JSONEncoder().encode(documents))
+    return JSONResponse(content=None).render(jsonable_encoder(transform_economic_events(events_data)))
+
+
+def new_path(documents):
+    return serialization.dumps(transform_economic_events(documents))
+
+
+def measure(fn, documents, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(documents)
+        best = min(best, time.perf_counter() - start)
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    documents = make_documents(args.events)
+    projection = EVENT_FIELDS + ("updatedAt",)
+    projected = [{field: document[field] for field in projection if field in document} for document in documents]
+    print(f"Events: {args.events}, orjson: {serialization.orjson is not None}")
+
+    results = {}
+    for label, fn, docs in (("old", old_path, documents),
+                            ("direct", new_path, documents),
+                            ("projected", new_path, projected)):
+        best, body = measure(fn, docs, args.repeat)
+        results[label] = (best, body)
+        print(f"{label:<10} {best * 1000:8.1f} ms  {args.events / best:12,.0f} events/s  {len(body):,} bytes")
+
+    baseline = results["old"][0]
+    for label in ("direct", "projected"):
+        print(f"{label} speedup: {baseline / results[label][0]:.1f}x")
+    identical = all(json.loads(body) == json.loads(results["old"][1]) for _, body in results.values())
+    print(f"Identical output: {identical}")
+    # The projection's main saving is on the wire from Mongo
+    full_bson = sum(len(bson.encode(document)) for document in documents)
+    projected_bson = sum(len(bson.encode(document)) for document in projected)
+    print(f"BSON fetched: {full_bson:,} bytes full, {projected_bson:,} bytes projected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Local fake of the Gemini and OpenRouter HTTP APIs for exercising llm_client.
+
+Usage:
+    python benchmarks/fake_llm_server.py [--port 9100] [--gemini-latency 0.2]
+        [--gemini-fail-rate 0] [--openrouter-latency 0.2] [--openrouter-fail-rate 0]
+
+Then point the app at it:
+
+    GEMINI_BASE_URL=http://127.0.0.1:9100 \\
+    OPENROUTER_BASE_URL=http://127.0.0.1:9100/api/v1 \\
+    GENAI_API_KEY=fake OPENROUTER_API_KEY=fake uvicorn main:app
+
+Failures are answered with HTTP 503 so they exercise the retry path. Both
+endpoints return a small valid signals JSON document; streaming requests
+(Gemini's :streamGenerateContent, OpenRouter's "stream": true) get it as
+server-sent events in STREAM_CHUNKS pieces spread over the latency.
+
+make_app can also script failures for tests: `statuses` answers a
+provider's next requests with the given HTTP error codes, in order, and
+`stream_stall` pauses that many seconds after the first streamed chunk.
+"""
+import argparse
+import asyncio
+import json
+import random
+
+from aiohttp import web
+
+SIGNALS = {
+    "market_summary": "Fake summary",
+    "signals": [
+        {"pair": "EURUSD", "direction": "BUY", "strength": "MEDIUM", "confidence": "60%",
+         "rationale": "Fake rationale", "impact": "Fake impact"},
+    ],
+}
+
+STREAM_CHUNKS = 8
+
+
+def _pieces(text):
+    size = -(-len(text) // STREAM_CHUNKS)
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def make_app(gemini_latency=0.2, gemini_fail_rate=0.0, openrouter_latency=0.2, openrouter_fail_rate=0.0,
+             statuses=None, stream_stall=0.0):
+    stats = {"gemini": 0, "openrouter": 0}
+    scripted = {provider: list(codes) for provider, codes in (statuses or {}).items()}
+
+    def failure(provider, fail_rate):
+        # Next scripted status of the provider, else a random outage
+        if scripted.get(provider):
+            status = scripted[provider].pop(0)
+        elif random.random() < fail_rate:
+            status = 503
+        else:
+            return None
+        return web.json_response({"error": {"code": status, "message": "fake failure", "status": "UNAVAILABLE"}},
+                                 status=status)
+
+    async def respond(provider, latency, fail_rate, body):
+        stats[provider] += 1
+        await asyncio.sleep(latency)
+        return failure(provider, fail_rate) or web.json_response(body)
+
+    async def stream(request, provider, latency, fail_rate, events):
+        stats[provider] += 1
+        error = failure(provider, fail_rate)
+        if error is not None:
+            await asyncio.sleep(latency)
+            return error
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for i, event in enumerate(events):
+            await asyncio.sleep(latency / len(events))
+            data = event if isinstance(event, str) else json.dumps(event)
+            await response.write(f"data: {data}\n\n".encode("utf-8"))
+            if i == 0 and stream_stall:
+                await asyncio.sleep(stream_stall)
+        return response
+
+    async def gemini(request):
+        text = "```json\n" + json.dumps(SIGNALS) + "\n```"
+        latency, fail_rate = request.app["gemini_latency"], request.app["gemini_fail_rate"]
+        if request.match_info["action"] == "streamGenerateContent":
+            return await stream(request, "gemini", latency, fail_rate, [
+                {"candidates": [{"content": {"role": "model", "parts": [{"text": piece}]}}]} for piece in _pieces(text)
+            ])
+        return await respond("gemini", latency, fail_rate, {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}],
+        })
+
+    async def openrouter(request):
+        text = json.dumps(SIGNALS)
+        latency, fail_rate = request.app["openrouter_latency"], request.app["openrouter_fail_rate"]
+        if (await request.json()).get("stream"):
+            return await stream(request, "openrouter", latency, fail_rate, [
+                {"choices": [{"delta": {"content": piece}}]} for piece in _pieces(text)
+            ] + ["[DONE]"])
+        return await respond("openrouter", latency, fail_rate, {
+            "choices": [{"message": {"role": "assistant", "content": text}}],
+        })
+
+    async def get_stats(request):
+        return web.json_response(stats)
+
+    app = web.Application()
+    app["gemini_latency"] = gemini_latency
+    app["gemini_fail_rate"] = gemini_fail_rate
+    app["openrouter_latency"] = openrouter_latency
+    app["openrouter_fail_rate"] = openrouter_fail_rate
+    app["stats"] = stats
+    app.router.add_post("/{version}/models/{model}:{action}", gemini)
+    app.router.add_post("/api/v1/chat/completions", openrouter)
+    app.router.add_get("/stats", get_stats)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--gemini-latency", type=float, default=0.2)
+    parser.add_argument("--gemini-fail-rate", type=float, default=0.0)
+    parser.add_argument("--openrouter-latency", type=float, default=0.2)
+    parser.add_argument("--openrouter-fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    web.run_app(make_app(args.gemini_latency, args.gemini_fail_rate,
+                         args.openrouter_latency, args.openrouter_fail_rate),
+                host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Load test concurrent GET /events requests against the FastAPI app.
+
+Usage:
+    python benchmarks/load_events.py [--requests 200] [--concurrency 20] [--rtt-ms 20]
+
+Runs the same request mix twice: once with DB calls made directly on the
+event loop (the old blocking behaviour) and once through the async_db thread
+pool. The /events response cache is disabled for both runs so every
+request reaches the DB. Uses a local mongod when available, otherwise
+mongomock with an injected round-trip delay per query.
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from unittest import mock
+
+from _mongo import LatencyCollection, get_mongo_client, make_events
+
+import mongo
+
+
+class BlockingDB:
+    """Awaitable facade that runs DB calls inline, blocking the event loop; other attributes pass through."""
+
+    def __init__(self, sync_db):
+        self.sync = sync_db
+
+    def __getattr__(self, name):
+        attr = getattr(self.sync, name)
+        if not callable(attr):
+            return attr
+
+        async def method(*args, **kwargs):
+            return attr(*args, **kwargs)
+        return method
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+    return samples[index]
+
+
+def run_load(base_url, requests, concurrency):
+    """Fire requests from `concurrency` client threads and time each one end to end."""
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    with httpx.Client(base_url=base_url, timeout=120, limits=limits) as client:
+        def one(i):
+            params = {"countries": ["USD", "EUR"]} if i % 2 else {}
+            start = time.perf_counter()
+            response = client.get("/events", params=params)
+            elapsed = time.perf_counter() - start
+            assert response.status_code == 200
+            return elapsed
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(one, range(requests)))
+        return latencies, time.perf_counter() - start
+
+
+@contextmanager
+def serve(app, port):
+    """Run the app with uvicorn in a background thread."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def report(label, latencies, wall):
+    print(f"{label:<10} p50 {percentile(latencies, 50) * 1000:8.1f} ms   "
+          f"p99 {percentile(latencies, 99) * 1000:8.1f} ms   "
+          f"mean {statistics.mean(latencies) * 1000:8.1f} ms   "
+          f"throughput {len(latencies) / wall:7.1f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rtt-ms", type=float, default=20.0,
+                        help="Simulated round trip per query (mongomock only)")
+    args = parser.parse_args()
+
+    client, backend = get_mongo_client()
+    print(f"Backend: {backend}, {args.requests} requests, concurrency {args.concurrency}")
+
+    with mock.patch.object(mongo, "MongoClient", lambda *a, **k: client):
+        import main as api
+
+    calendar = api.calendar_db.sync
+    calendar.events = client["bench_forex_scraper"]["economic_events"]
+    calendar.events.delete_many({})
+    calendar.save_events(make_events(args.events), bulk=False)
+    if backend == "mongomock":
+        calendar.events = LatencyCollection(calendar.events, args.rtt_ms)
+
+    offloaded = api.calendar_db
+    # Measure the DB path, not cached responses
+    api.events_cache.max_entries = 0
+    api.events_cache.clear()
+    # Silence the per-request filter logging of the handler
+    with serve(api.app, args.port) as base_url, contextlib.redirect_stdout(io.StringIO()):
+        try:
+            api.calendar_db = BlockingDB(calendar)
+            blocking = run_load(base_url, args.requests, args.concurrency)
+
+            api.calendar_db = offloaded
+            nonblocking = run_load(base_url, args.requests, args.concurrency)
+        finally:
+            api.calendar_db = offloaded
+
+    report("blocking", *blocking)
+    report("offloaded", *nonblocking)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Cold-start profile of the API server.
+
+Usage:
+    python benchmarks/startup_profile.py [--top 15] [--budget-ms 1500]
+
+Reports:
+  * the `python -X importtime -c "import main"` breakdown of the heaviest
+    top-level imports, and whether the scraping/LLM stacks were loaded
+  * time from spawning `uvicorn main:app` to the first successful GET /
+    and GET /openapi.json
+
+Exits non-zero when importing main exceeds --budget-ms, so a cold-start
+regression shows up in CI or before a deploy.
+"""
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be imported just to serve read-only routes
+LAZY_MODULES = ["scraper", "selenium", "selenium_stealth", "webdriver_manager",
+                "bs4", "signal_generator", "llm_client", "aiohttp", "google.genai", "requests"]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_profile():
+    """Return (total_us, [(cumulative_us, module)] for top-level imports, imported modules)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SERVER_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+
+    top_level = []
+    imported = set()
+    total = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, module = match.groups()
+        imported.add(module)
+        if module == "main":
+            total = int(cumulative)
+        elif len(indent) == 3:
+            # Direct imports of main (nesting level 1)
+            top_level.append((int(cumulative), module))
+    return total, sorted(top_level, reverse=True), imported
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_response(paths, timeout=60):
+    """Spawn uvicorn and time the first successful response for each path."""
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    timings = {}
+    try:
+        for path in paths:
+            while True:
+                if time.perf_counter() - start > timeout:
+                    raise TimeoutError(f"No response from {path} within {timeout}s")
+                try:
+                    with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=5) as response:
+                        if response.status == 200:
+                            timings[path] = time.perf_counter() - start
+                            break
+                except OSError:
+                    time.sleep(0.02)
+    finally:
+        process.terminate()
+        process.wait()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1500")))
+    args = parser.parse_args()
+
+    total, top_level, imported = import_profile()
+    print(f"import main: {total / 1000:.1f} ms")
+    print(f"{'cumulative ms':>14}  module")
+    for cumulative, module in top_level[:args.top]:
+        print(f"{cumulative / 1000:>14.1f}  {module}")
+
+    eager = [module for module in LAZY_MODULES if module in imported]
+    print(f"lazy stacks imported at startup: {', '.join(eager) if eager else 'none'}")
+
+    for path, seconds in time_to_first_response(["/", "/openapi.json"]).items():
+        print(f"first response {path}: {seconds * 1000:.0f} ms after spawn")
+
+    if total / 1000 > args.budget_ms:
+        print(f"FAIL: import time exceeds budget of {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
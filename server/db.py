@@ -1,17 +1,44 @@
 import pymongo
-from pymongo import MongoClient
-from datetime import datetime
+from pymongo import UpdateOne
+from datetime import datetime, timedelta, timezone
 import pytz
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 import os
 from dotenv import load_dotenv
 import re
 import json
+import hashlib
+import threading
 from bson import ObjectId
+from mongo import ensure_indexes, get_database
+from pagination import keyset_filter
+from event_time import to_utc
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Number of upserts sent per bulk_write call by EconomicCalendarDB.save_events
+SAVE_EVENTS_BATCH_SIZE = int(os.getenv("SAVE_EVENTS_BATCH_SIZE", "500"))
+
+# Seconds a cached LLM response stays reusable (Mongo TTL index on createdAt)
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 60 * 60)))
+
+# Documents fetched per round trip by EconomicCalendarDB.iter_events
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# Bumped whenever the fields derived at ingest change; documents stored with an
+# older version are recomputed by EconomicCalendarDB.backfill_derived_fields
+DERIVED_FIELDS_VERSION = 3
+
+# Leading number of a calendar value such as "0.2%", "-1.5K", "<0.1" or "245B",
+# matched after thousands separators are removed ("1,234K" -> "1234K")
+_NUMBER_RE = re.compile(r"([-+]?\d+(?:\.\d+)?)\s*([KMBT])?", re.IGNORECASE)
+_NUMBER_SCALE = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+
+# Sort order of EconomicCalendarDB.get_events (UTC time, then insertion);
+# unique, so it doubles as the keyset for cursor pagination
+EVENT_SORT_KEYS = ("timestamp", "_id")
+
 # Add JSONEncoder class to handle MongoDB ObjectId
 class JSONEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -22,58 +49,43 @@ class JSONEncoder(json.JSONEncoder):
         return super(JSONEncoder, self).default(obj)
 
 class EconomicCalendarDB:
-    def __init__(self):
-        """Initialize MongoDB connection using environment variables."""
-        mongodb_uri = os.getenv("URI", "mongodb://localhost:27017")
-        db_name = os.getenv("MONGODB_DB", "forex_scraper")
-        self.client = MongoClient(mongodb_uri)
-        self.db = self.client[db_name]
+    # (keys, options) for every index the queries below rely on
+    INDEXES = [
+        # Unique index on eventId to avoid duplicates
+        ("eventId", {"unique": True}),
+        # Indexes for common query patterns
+        ("date", {}),
+        ("country", {}),
+        ("source", {}),
+        ([("date", pymongo.ASCENDING), ("impact", pymongo.ASCENDING)], {}),
+        # Sort key of get_events, also used for keyset pagination
+        ([("timestamp", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)], {}),
+        # Time-window lookups narrowed by impact and country
+        ([("timestamp", pymongo.ASCENDING), ("impact", pymongo.ASCENDING), ("country", pymongo.ASCENDING)], {}),
+    ]
+    
+    def __init__(self, db=None):
+        """
+        Initialize the events collection.
+        
+        Args:
+            db: Database handle; defaults to the process-wide shared client
+        """
+        self.db = db if db is not None else get_database()
         self.events = self.db.economic_events
         
-        # Create indexes
-        self._create_indexes()
-    
-    def _create_indexes(self):
-        """Create necessary indexes for efficient querying."""
-        # Create a unique index on eventId to avoid duplicates
-        self.events.create_index("eventId", unique=True)
-        
-        # Create indexes for common query patterns
-        self.events.create_index("date")
-        self.events.create_index("country")
-        self.events.create_index("source")
-        self.events.create_index([("date", pymongo.ASCENDING), ("time", pymongo.ASCENDING)])
-        self.events.create_index([("date", pymongo.ASCENDING), ("impact", pymongo.ASCENDING)])
+        # eventId -> content fingerprint of the stored document, used to skip
+        # unchanged events before they reach Mongo
+        self._fingerprints: Dict[str, str] = {}
+        self._fingerprint_lock = threading.Lock()
+        
+        # Incremented whenever save_events writes; read caches compare it to
+        # invalidate responses computed from older data
+        self.data_version = 0
     
-    def _convert_time_to_iso(self, date_str: str, time_str: Optional[str]) -> Optional[datetime]:
-        """Convert date string and time string to ISO datetime."""
-        if not date_str:
-            return None
-            
-        try:
-            # Handle case where time is not available
-            if not time_str or time_str in ["All Day", "Tentative"]:
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-                return date_obj
-            
-            # Clean time string (remove any non-numeric or colon characters)
-            time_str = re.sub(r'[^0-9:]', '', time_str)
-            
-            # Handle cases where time might be incomplete
-            if ":" not in time_str:
-                if len(time_str) <= 2:
-                    time_str = f"{time_str}:00"
-                else:
-                    # Try to split into hours and minutes
-                    time_str = f"{time_str[:-2]}:{time_str[-2:]}"
-                    
-            # Create ISO datetime
-            datetime_str = f"{date_str} {time_str}"
-            return datetime.strptime(datetime_str, "%Y-%m-%d %H:%M")
-            
-        except Exception as e:
-            print(f"Error converting time: {str(e)} for date '{date_str}' and time '{time_str}'")
-            return None
+    def ensure_indexes(self) -> int:
+        """Create missing indexes; returns the number created."""
+        return ensure_indexes(self.events, self.INDEXES)
     
     def _normalize_impact(self, impact: Optional[str]) -> Optional[str]:
         """Normalize impact values from different sources."""
@@ -91,92 +103,252 @@ class EconomicCalendarDB:
             return "low"
         return impact
     
-    def save_events(self, events: List[Dict[str, Any]]) -> Dict[str, int]:
+    def _parse_value(self, value: Optional[str]) -> Optional[float]:
+        """Parse a displayed calendar value ("1.5K", "0.2%") into a number, K/M/B/T scaled."""
+        if not isinstance(value, str):
+            return float(value) if isinstance(value, (int, float)) else None
+        
+        # Commas are thousands separators; some sources print a Unicode minus sign
+        match = _NUMBER_RE.search(value.replace(",", "").replace("\u2212", "-"))
+        if not match:
+            return None
+        number = float(match.group(1))
+        suffix = match.group(2)
+        return number * _NUMBER_SCALE[suffix.upper()] if suffix else number
+    
+    def _derived_fields(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compute the fields derived from the scraped values: the UTC timestamp
+        (see event_time.to_utc) and the numeric values used by get_event_stats.
+        """
+        return {
+            "timestamp": to_utc(document.get("date"), document.get("time"), document.get("source")),
+            "actualValue": self._parse_value(document.get("actual")),
+            "forecastValue": self._parse_value(document.get("forecast")),
+            "previousValue": self._parse_value(document.get("previous")),
+            "derivedVersion": DERIVED_FIELDS_VERSION,
+        }
+    
+    def backfill_derived_fields(self, batch_size: Optional[int] = None) -> int:
+        """
+        Recompute derived fields of documents stored before DERIVED_FIELDS_VERSION.
+        
+        Args:
+            batch_size: Number of updates per bulk_write call
+                (defaults to SAVE_EVENTS_BATCH_SIZE)
+            
+        Returns:
+            Number of documents updated
+        """
+        batch_size = batch_size or SAVE_EVENTS_BATCH_SIZE
+        cursor = self.events.find(
+            {"derivedVersion": {"$ne": DERIVED_FIELDS_VERSION}},
+            {"sourceData": 0}
+        )
+        
+        updated = 0
+        batch = []
+        for document in cursor:
+            batch.append(UpdateOne({"_id": document["_id"]}, {"$set": self._derived_fields(document)}))
+            if len(batch) >= batch_size:
+                updated += self.events.bulk_write(batch, ordered=False).modified_count
+                batch = []
+        if batch:
+            updated += self.events.bulk_write(batch, ordered=False).modified_count
+        
+        if updated:
+            with self._fingerprint_lock:
+                self.data_version += 1
+        return updated
+    
+    def warm_fingerprint_cache(self) -> int:
+        """
+        Load stored event fingerprints into the in-process cache.
+        
+        Returns:
+            Number of fingerprints loaded
+        """
+        cursor = self.events.find(
+            {"fingerprint": {"$exists": True}},
+            {"_id": 0, "eventId": 1, "fingerprint": 1}
+        )
+        fingerprints = {doc["eventId"]: doc["fingerprint"] for doc in cursor}
+        
+        with self._fingerprint_lock:
+            self._fingerprints.update(fingerprints)
+        
+        return len(fingerprints)
+    
+    def _fingerprint(self, document: Dict[str, Any]) -> str:
+        """Hash the normalized fields that change between scrapes of the same event."""
+        values = [
+            (document.get(field) or "").strip() if isinstance(document.get(field), str)
+            else document.get(field)
+            for field in ("time", "actual", "forecast", "previous", "impact")
+        ]
+        payload = json.dumps(values, separators=(",", ":"), default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    
+    def _is_unchanged(self, document: Dict[str, Any]) -> bool:
+        """Check whether the stored copy of the event has the same fingerprint."""
+        with self._fingerprint_lock:
+            return self._fingerprints.get(document["eventId"]) == document["fingerprint"]
+    
+    def _remember_fingerprints(self, documents: List[Dict[str, Any]]) -> None:
+        """Record fingerprints of written documents and bump the data version."""
+        with self._fingerprint_lock:
+            for document in documents:
+                self._fingerprints[document["eventId"]] = document["fingerprint"]
+            self.data_version += 1
+    
+    def _build_event_document(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Build the normalized document stored for a scraped event.
+        
+        Args:
+            event: Raw event dictionary as returned by the parsers
+            
+        Returns:
+            Document ready for upsert, or None if the event is invalid
+        """
+        # Skip invalid events
+        if not event.get("date") or not event.get("event") or not event.get("country"):
+            return None
+            
+        # Create a unique ID for the event
+        event_time = event.get("time", "00:00")
+        event_id = f"{event['date']}_{event_time}_{event['country']}_{event['event']}"
+        
+        # Normalize impact value
+        normalized_impact = self._normalize_impact(event.get("impact"))
+        
+        # Prepare document for upsert
+        document = {
+            "eventId": event_id,
+            "date": event.get("date"),
+            "time": event.get("time"),
+            "country": event.get("country"),
+            "event": event.get("event"),
+            "impact": normalized_impact,
+            "actual": event.get("actual"),
+            "forecast": event.get("forecast"),
+            "previous": event.get("previous"),
+            "source": event.get("source"),
+            "sourceData": event,  # Store original data
+            "updatedAt": datetime.now()
+        }
+        
+        document.update(self._derived_fields(document))
+        document["fingerprint"] = self._fingerprint(document)
+        
+        return document
+    
+    def _build_upsert(self, document: Dict[str, Any]) -> UpdateOne:
+        """Build the upsert operation for a prepared event document."""
+        return UpdateOne(
+            {"eventId": document["eventId"]},
+            {
+                "$set": document,
+                "$setOnInsert": {"createdAt": datetime.now()}
+            },
+            upsert=True
+        )
+    
+    def save_events(self,
+                    events: Iterable[Dict[str, Any]],
+                    bulk: bool = True,
+                    batch_size: Optional[int] = None) -> Dict[str, int]:
         """
         Save events to database with upsert to avoid duplicates.
         
+        Events whose fingerprint matches the cached fingerprint of the stored
+        document are skipped without a write. Every write bumps data_version
+        so cached read responses built from older data are discarded.
+        
         Args:
-            events: List of event dictionaries
+            events: Iterable of event dictionaries
+            bulk: Send upserts as unordered bulk_write batches instead of
+                one update_one round trip per event
+            batch_size: Number of upserts per bulk_write call
+                (defaults to SAVE_EVENTS_BATCH_SIZE)
             
         Returns:
-            Dictionary with counts of created and updated records
+            Dictionary with counts of created, updated and skipped records
         """
+        if not bulk:
+            return self._save_events_one_by_one(events)
+        
+        batch_size = batch_size or SAVE_EVENTS_BATCH_SIZE
         created = 0
         updated = 0
+        skipped = 0
+        batch = []
         
         for event in events:
-            # Skip invalid events
-            if not event.get("date") or not event.get("event") or not event.get("country"):
+            document = self._build_event_document(event)
+            if document is None:
+                continue
+            if self._is_unchanged(document):
+                skipped += 1
                 continue
-                
-            # Create a unique ID for the event
-            event_time = event.get("time", "00:00")
-            event_id = f"{event['date']}_{event_time}_{event['country']}_{event['event']}"
-            
-            # Create ISO timestamp if possible
-            timestamp = self._convert_time_to_iso(event.get("date"), event.get("time"))
-            
-            # Normalize impact value
-            normalized_impact = self._normalize_impact(event.get("impact"))
-            
-            # Prepare document for upsert
-            document = {
-                "eventId": event_id,
-                "date": event.get("date"),
-                "time": event.get("time"),
-                "country": event.get("country"),
-                "event": event.get("event"),
-                "impact": normalized_impact,
-                "actual": event.get("actual"),
-                "forecast": event.get("forecast"),
-                "previous": event.get("previous"),
-                "source": event.get("source"),
-                "sourceData": event,  # Store original data
-                "updatedAt": datetime.now()
-            }
             
-            # Add timestamp if available
-            if timestamp:
-                document["timestamp"] = timestamp
+            batch.append(document)
+            if len(batch) >= batch_size:
+                result = self.events.bulk_write([self._build_upsert(d) for d in batch], ordered=False)
+                self._remember_fingerprints(batch)
+                created += result.upserted_count
+                updated += result.modified_count
+                batch = []
+        
+        if batch:
+            result = self.events.bulk_write([self._build_upsert(d) for d in batch], ordered=False)
+            self._remember_fingerprints(batch)
+            created += result.upserted_count
+            updated += result.modified_count
+        
+        return {"created": created, "updated": updated, "skipped": skipped}
+    
+    def _save_events_one_by_one(self, events: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Per-document upsert path, one round trip per event."""
+        created = 0
+        updated = 0
+        skipped = 0
+        
+        for event in events:
+            document = self._build_event_document(event)
+            if document is None:
+                continue
+            if self._is_unchanged(document):
+                skipped += 1
+                continue
             
             # Upsert the document
             result = self.events.update_one(
-                {"eventId": event_id},
+                {"eventId": document["eventId"]},
                 {
                     "$set": document,
                     "$setOnInsert": {"createdAt": datetime.now()}
                 },
                 upsert=True
             )
+            self._remember_fingerprints([document])
             
             if result.upserted_id:
                 created += 1
             elif result.modified_count > 0:
                 updated += 1
         
-        return {"created": created, "updated": updated}
+        return {"created": created, "updated": updated, "skipped": skipped}
     
-    def get_events(self, 
-                  start_date: Optional[str] = None,
-                  end_date: Optional[str] = None,
-                  countries: Optional[List[str]] = None,
-                  impact: Optional[List[str]] = None,
-                  sources: Optional[List[str]] = None,
-                  ) -> List[Dict[str, Any]]:
-        """
-        Query events with various filters.
-        
-        Args:
-            start_date: Start date in YYYY-MM-DD format
-            end_date: End date in YYYY-MM-DD format
-            countries: List of country/currency codes to filter
-            impact: List of impact levels to filter ("high", "medium", "low")
-            sources: List of sources to include
-            limit: Maximum number of records to return
-            
-        Returns:
-            List of event dictionaries
-        """
+    def _events_query(self,
+                      start_date: Optional[str] = None,
+                      end_date: Optional[str] = None,
+                      countries: Optional[List[str]] = None,
+                      impact: Optional[List[str]] = None,
+                      sources: Optional[List[str]] = None,
+                      start_time: Optional[datetime] = None,
+                      end_time: Optional[datetime] = None) -> Dict[str, Any]:
+        """Build the Mongo filter shared by get_events and iter_events."""
         query = {}
         
         # Add date range filter
@@ -200,41 +372,283 @@ class EconomicCalendarDB:
         if sources:
             query["source"] = {"$in": sources}
         
+        # Add UTC time window filter on the normalized timestamp
+        if start_time or end_time:
+            time_filter = {}
+            if start_time:
+                time_filter["$gte"] = start_time
+            if end_time:
+                time_filter["$lt"] = end_time
+            query["timestamp"] = time_filter
+        
+        return query
+    
+    def get_events(self, 
+                  start_date: Optional[str] = None,
+                  end_date: Optional[str] = None,
+                  countries: Optional[List[str]] = None,
+                  impact: Optional[List[str]] = None,
+                  sources: Optional[List[str]] = None,
+                  start_time: Optional[datetime] = None,
+                  end_time: Optional[datetime] = None,
+                  fields: Optional[Iterable[str]] = None,
+                  limit: int = 0,
+                  after: Optional[Dict[str, Any]] = None,
+                  ) -> List[Dict[str, Any]]:
+        """
+        Query events with various filters.
+        
+        Args:
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format
+            countries: List of country/currency codes to filter
+            impact: List of impact levels to filter ("high", "medium", "low")
+            sources: List of sources to include
+            start_time: Only events at or after this UTC time (timestamp field)
+            end_time: Only events before this UTC time
+            fields: Only return these fields (_id is left out unless listed or
+                limit is set); every field except sourceData is returned by default
+            limit: Maximum number of records to return (0 for no limit); when set,
+                the sort key fields are always returned so the page can be continued
+            after: Sort key (EVENT_SORT_KEYS) of the last event of the previous
+                page; only events sorting after it are returned
+            
+        Returns:
+            List of event dictionaries
+        """
+        query = self._events_query(start_date, end_date, countries, impact, sources, start_time, end_time)
+        
+        # Continue after the previous page
+        if after is not None:
+            query.update(keyset_filter(after, EVENT_SORT_KEYS))
+        
+        if fields:
+            projection = {field: 1 for field in fields}
+            if limit:
+                projection.update({key: 1 for key in EVENT_SORT_KEYS})
+            else:
+                projection.setdefault("_id", 0)
+        else:
+            projection = {"sourceData": 0}  # Exclude the sourceData field to reduce response size
+        
         # Execute query
         cursor = self.events.find(
             query,
-            {"sourceData": 0}  # Exclude the sourceData field to reduce response size
-        ).sort([("date", pymongo.ASCENDING), ("time", pymongo.ASCENDING)])
+            projection
+        ).sort([(key, pymongo.ASCENDING) for key in EVENT_SORT_KEYS])
+        if limit:
+            cursor = cursor.limit(limit)
         
         return list(cursor)
     
+    def get_events_for_day(self,
+                           day: Optional[str] = None,
+                           fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch the events of a single day with an indexed date match.
+        
+        Args:
+            day: Date in YYYY-MM-DD format (defaults to today, server local time)
+            fields: Only return these fields (see get_events)
+            
+        Returns:
+            List of event dictionaries in get_events order
+        """
+        day = day or datetime.now().strftime('%Y-%m-%d')
+        return self.get_events(start_date=day, end_date=day, fields=fields)
+    
+    def count_events(self,
+                     start_date: Optional[str] = None,
+                     end_date: Optional[str] = None,
+                     countries: Optional[List[str]] = None,
+                     impact: Optional[List[str]] = None,
+                     sources: Optional[List[str]] = None,
+                     start_time: Optional[datetime] = None,
+                     end_time: Optional[datetime] = None) -> int:
+        """
+        Count events matching the get_events filters without fetching them.
+        
+        Without filters the count comes from collection metadata
+        (estimated_document_count), so it costs the same for any history size.
+        
+        Returns:
+            Number of matching events
+        """
+        query = self._events_query(start_date, end_date, countries, impact, sources, start_time, end_time)
+        if not query:
+            return self.events.estimated_document_count()
+        return self.events.count_documents(query)
+    
+    def get_event_stats(self,
+                        start_date: Optional[str] = None,
+                        end_date: Optional[str] = None,
+                        countries: Optional[List[str]] = None,
+                        impact: Optional[List[str]] = None,
+                        sources: Optional[List[str]] = None,
+                        start_time: Optional[datetime] = None,
+                        end_time: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Aggregate event counts and forecast surprises server-side.
+        
+        A single aggregation runs the get_events filter as its first $match
+        stage, so it is served by the date/country/impact/source indexes.
+        A $facet then computes every grouping in one pass.
+        
+        Args:
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format
+            countries: List of country/currency codes to filter
+            impact: List of impact levels to filter ("high", "medium", "low")
+            sources: List of sources to include
+            start_time: Only events at or after this UTC time (timestamp field)
+            end_time: Only events before this UTC time
+            
+        Returns:
+            Dictionary with the total, counts keyed by date/country/impact/source,
+            and surprise metrics (actual - forecast) overall and per country
+        """
+        def count_by(field: str, sort: Dict[str, int]) -> List[Dict[str, Any]]:
+            return [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}, {"$sort": sort}]
+        
+        def surprise_by(field: Optional[str]) -> List[Dict[str, Any]]:
+            return [
+                {"$match": {"actualValue": {"$ne": None}, "forecastValue": {"$ne": None}}},
+                {"$project": {
+                    "country": 1,
+                    "forecastValue": 1,
+                    "delta": {"$subtract": ["$actualValue", "$forecastValue"]}
+                }},
+                {"$group": {
+                    "_id": f"${field}" if field else None,
+                    "events": {"$sum": 1},
+                    "beats": {"$sum": {"$cond": [{"$gt": ["$delta", 0]}, 1, 0]}},
+                    "misses": {"$sum": {"$cond": [{"$lt": ["$delta", 0]}, 1, 0]}},
+                    "mean_delta": {"$avg": "$delta"},
+                    "mean_abs_delta": {"$avg": {"$abs": "$delta"}},
+                    # Delta as a fraction of the forecast, comparable across indicators
+                    "mean_relative_delta": {"$avg": {"$cond": [
+                        {"$eq": ["$forecastValue", 0]},
+                        None,
+                        {"$divide": ["$delta", {"$abs": "$forecastValue"}]}
+                    ]}},
+                }},
+                {"$sort": {"events": -1, "_id": 1}},
+            ]
+        
+        def surprise_metrics(group: Dict[str, Any]) -> Dict[str, Any]:
+            metrics = {key: value for key, value in group.items() if key != "_id"}
+            metrics["inline"] = metrics["events"] - metrics["beats"] - metrics["misses"]
+            return metrics
+        
+        pipeline = [
+            {"$match": self._events_query(start_date, end_date, countries, impact, sources, start_time, end_time)},
+            {"$facet": {
+                "total": [{"$count": "count"}],
+                "by_date": count_by("date", {"_id": 1}),
+                "by_country": count_by("country", {"count": -1, "_id": 1}),
+                "by_impact": count_by("impact", {"count": -1, "_id": 1}),
+                "by_source": count_by("source", {"count": -1, "_id": 1}),
+                "surprise": surprise_by(None),
+                "surprise_by_country": surprise_by("country"),
+            }},
+        ]
+        result = next(self.events.aggregate(pipeline), {})
+        
+        total = result.get("total", [])
+        surprise = result.get("surprise", [])
+        return {
+            "total": total[0]["count"] if total else 0,
+            "by_date": {group["_id"]: group["count"] for group in result.get("by_date", [])},
+            "by_country": {group["_id"]: group["count"] for group in result.get("by_country", [])},
+            "by_impact": {group["_id"]: group["count"] for group in result.get("by_impact", [])},
+            "by_source": {group["_id"]: group["count"] for group in result.get("by_source", [])},
+            "surprise": {
+                "overall": surprise_metrics(surprise[0] if surprise else {
+                    "events": 0, "beats": 0, "misses": 0,
+                    "mean_delta": None, "mean_abs_delta": None, "mean_relative_delta": None,
+                }),
+                "by_country": {group["_id"]: surprise_metrics(group) for group in result.get("surprise_by_country", [])},
+            },
+        }
+    
+    def iter_events(self,
+                    start_date: Optional[str] = None,
+                    end_date: Optional[str] = None,
+                    countries: Optional[List[str]] = None,
+                    impact: Optional[List[str]] = None,
+                    sources: Optional[List[str]] = None,
+                    start_time: Optional[datetime] = None,
+                    end_time: Optional[datetime] = None,
+                    fields: Optional[Iterable[str]] = None,
+                    batch_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream events matching the get_events filters straight from the cursor.
+        
+        Only one cursor batch is held in memory at a time, so this suits
+        exports of arbitrarily large ranges. The cursor is closed when the
+        generator is closed or garbage collected.
+        
+        Args:
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format
+            countries: List of country/currency codes to filter
+            impact: List of impact levels to filter ("high", "medium", "low")
+            sources: List of sources to include
+            start_time: Only events at or after this UTC time (timestamp field)
+            end_time: Only events before this UTC time
+            fields: Only return these fields; every field except sourceData
+                is returned by default
+            batch_size: Documents fetched per round trip (defaults to EXPORT_BATCH_SIZE)
+            
+        Yields:
+            Event dictionaries in get_events order
+        """
+        query = self._events_query(start_date, end_date, countries, impact, sources, start_time, end_time)
+        if fields:
+            projection = {field: 1 for field in fields}
+            projection.setdefault("_id", 0)
+        else:
+            projection = {"sourceData": 0}
+        
+        cursor = self.events.find(
+            query,
+            projection
+        ).sort([(key, pymongo.ASCENDING) for key in EVENT_SORT_KEYS]).batch_size(batch_size or EXPORT_BATCH_SIZE)
+        try:
+            yield from cursor
+        finally:
+            cursor.close()
+    
 class SignalDB:
-    def __init__(self):
-        """Initialize MongoDB connection for signals."""
-        mongodb_uri = os.getenv("URI", "mongodb://localhost:27017")
-        db_name = os.getenv("MONGODB_DB", "forex_scraper")
-        self.client = MongoClient(mongodb_uri)
-        self.db = self.client[db_name]
-        self.signals = self.db.signals
+    # (keys, options) for every index the queries below rely on
+    INDEXES = [
+        # Unique index on signalId to avoid duplicates
+        ("signalId", {"unique": True}),
+        # Indexes for common query patterns
+        ("date", {}),
+        ("pair", {}),
+        ("direction", {}),
+        ("strength", {}),
+        ("confidence", {}),
+        ("rationale", {}),
+        ("impact", {}),
+        ([("date", pymongo.ASCENDING), ("pair", pymongo.ASCENDING)], {}),
+        ([("date", pymongo.ASCENDING), ("direction", pymongo.ASCENDING)], {}),
+    ]
+    
+    def __init__(self, db=None):
+        """
+        Initialize the signals collection.
         
-        # Create indexes
-        self._create_indexes()
+        Args:
+            db: Database handle; defaults to the process-wide shared client
+        """
+        self.db = db if db is not None else get_database()
+        self.signals = self.db.signals
     
-    def _create_indexes(self):
-        """Create necessary indexes for efficient querying."""
-        # Create a unique index on signalId to avoid duplicates
-        self.signals.create_index("signalId", unique=True)
-        
-        # Create indexes for common query patterns
-        self.signals.create_index("date")
-        self.signals.create_index("pair")
-        self.signals.create_index("direction")
-        self.signals.create_index("strength")
-        self.signals.create_index("confidence")
-        self.signals.create_index("rationale")
-        self.signals.create_index("impact")
-        self.signals.create_index([("date", pymongo.ASCENDING), ("pair", pymongo.ASCENDING)])
-        self.signals.create_index([("date", pymongo.ASCENDING), ("direction", pymongo.ASCENDING)])
+    def ensure_indexes(self) -> int:
+        """Create missing indexes; returns the number created."""
+        return ensure_indexes(self.signals, self.INDEXES)
 
     
     def save_signals(self, signals_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -270,6 +684,7 @@ class SignalDB:
                         "$set": {
                             "market_summary": signals_data.get("market_summary", ""),
                             "signals": signals_data.get("signals", []),
+                            "event_snapshot": signals_data.get("event_snapshot"),
                             "timestamp": datetime.now(),
                             "updatedAt": datetime.now()
                         }
@@ -355,13 +770,82 @@ class SignalDB:
         # Execute query
         cursor = self.signals.find(
             query,
-            {"signalId": 0}  # Exclude the signalId field to reduce response size
+            {"signalId": 0, "event_snapshot": 0}  # Exclude internal fields to reduce response size
         ).sort([("date", pymongo.DESCENDING), ("pair", pymongo.ASCENDING)]).limit(limit)
         
         return list(cursor)
     
 
+    def get_signal_set(self, date: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the stored signal set of a day, including the snapshot of the
+        events it was generated from (see utils.signalDiff).
+        
+        Args:
+            date: Date in YYYY-MM-DD format
+            
+        Returns:
+            Signal document, or None if no signals were generated that day
+        """
+        return self.signals.find_one({"date": date}, {"signalId": 0})
+    
     def get_today_signals(self) -> List[Dict[str, Any]]:
         """Fetch signals for today."""
         today = datetime.now(pytz.timezone('UTC')).strftime('%Y-%m-%d')
         return self.get_signals(start_date=today, end_date=today)
+
+
+
+class LLMResponseCacheDB:
+    # Expired entries are removed by Mongo's TTL monitor. Changing LLM_CACHE_TTL
+    # does not alter an existing TTL index; drop it (or use collMod) to apply.
+    INDEXES = [
+        ("key", {"unique": True}),
+        ("createdAt", {"expireAfterSeconds": LLM_CACHE_TTL}),
+    ]
+    
+    def __init__(self, db=None):
+        """
+        Initialize the LLM response cache collection.
+        
+        Args:
+            db: Database handle; defaults to the process-wide shared client
+        """
+        self.db = db if db is not None else get_database()
+        self.responses = self.db.llm_responses
+    
+    def ensure_indexes(self) -> int:
+        """Create missing indexes; returns the number created."""
+        return ensure_indexes(self.responses, self.INDEXES)
+    
+    def get_response(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response by its content key (see llm_cache.llm_cache_key).
+        
+        Entries older than LLM_CACHE_TTL are treated as missing even before the
+        TTL monitor (which runs about once a minute) has deleted them.
+        
+        Returns:
+            Cached document with the response text, or None
+        """
+        # Mongo stores datetimes as UTC, and the TTL monitor compares in UTC
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=LLM_CACHE_TTL)
+        return self.responses.find_one(
+            {"key": key, "createdAt": {"$gte": cutoff}},
+            {"_id": 0}
+        )
+    
+    def save_response(self, key: str, response: str, **metadata: Any) -> None:
+        """
+        Store an LLM response under its content key, replacing any older entry.
+        
+        Args:
+            key: Content key of the request
+            response: Raw response text
+            **metadata: Extra fields stored alongside (model, prompt_version, ...)
+        """
+        self.responses.update_one(
+            {"key": key},
+            {"$set": {"key": key, "response": response, "createdAt": datetime.now(timezone.utc), **metadata}},
+            upsert=True
+        )
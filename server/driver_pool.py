@@ -0,0 +1,191 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+# Maximum number of browser sessions alive at the same time
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "2"))
+# Recycle a browser after it has served this many scrapes
+DRIVER_MAX_USES = int(os.getenv("DRIVER_MAX_USES", "20"))
+# Seconds to wait for a free browser before giving up
+DRIVER_LEASE_TIMEOUT = float(os.getenv("DRIVER_LEASE_TIMEOUT", "120"))
+
+
+class DriverPoolClosed(RuntimeError):
+    """Raised when a driver is requested from a pool that has been shut down."""
+
+
+class _PooledDriver:
+    def __init__(self, driver: Any):
+        self.driver = driver
+        self.uses = 0
+
+
+class DriverPool:
+    """
+    Bounded pool of warm WebDriver sessions shared across scrapes.
+
+    Drivers are created lazily by the factory, health-checked before every
+    lease, have their cookies and storage wiped when returned, and are
+    recycled after `max_uses` leases or when a lease ends with an exception.
+    """
+
+    def __init__(self,
+                 factory: Callable[[], Any],
+                 size: int = DRIVER_POOL_SIZE,
+                 max_uses: int = DRIVER_MAX_USES,
+                 lease_timeout: float = DRIVER_LEASE_TIMEOUT):
+        """
+        Args:
+            factory: Callable returning a new, ready-to-use driver
+            size: Maximum number of concurrent browser sessions
+            max_uses: Number of leases after which a driver is recycled
+            lease_timeout: Seconds to wait for a free driver
+        """
+        self._factory = factory
+        self._max_uses = max_uses
+        self._lease_timeout = lease_timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._idle: List[_PooledDriver] = []
+        self._closed = False
+        self.size = size
+        self.stats = {"created": 0, "reused": 0, "recycled": 0, "unhealthy": 0}
+
+    @contextmanager
+    def lease(self):
+        """
+        Borrow a driver for the duration of a `with` block.
+
+        Any exception raised inside the block marks the driver as crashed so
+        that it is quit instead of returned to the pool.
+        """
+        if self._closed:
+            raise DriverPoolClosed("Driver pool has been shut down")
+        if not self._slots.acquire(timeout=self._lease_timeout):
+            raise TimeoutError(f"No browser available after {self._lease_timeout}s")
+
+        try:
+            pooled = self._checkout()
+            crashed = False
+            try:
+                yield pooled.driver
+            except BaseException:
+                crashed = True
+                raise
+            finally:
+                self._checkin(pooled, crashed)
+        finally:
+            self._slots.release()
+
+    def _checkout(self) -> _PooledDriver:
+        """Return a healthy idle driver, or start a new one."""
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise DriverPoolClosed("Driver pool has been shut down")
+                pooled = self._idle.pop() if self._idle else None
+
+            if pooled is None:
+                break
+            if self._is_healthy(pooled.driver):
+                self._count("reused")
+                return pooled
+
+            self._count("unhealthy")
+            self._quit(pooled)
+
+        driver = self._factory()
+        self._count("created")
+        return _PooledDriver(driver)
+
+    def _checkin(self, pooled: _PooledDriver, crashed: bool) -> None:
+        """Reset a returned driver and put it back, or recycle it."""
+        pooled.uses += 1
+
+        if crashed or self._closed or pooled.uses >= self._max_uses or not self._reset(pooled.driver):
+            self._count("recycled")
+            self._quit(pooled)
+            return
+
+        with self._lock:
+            if not self._closed:
+                self._idle.append(pooled)
+                return
+        self._quit(pooled)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _is_healthy(self, driver: Any) -> bool:
+        """Check that the browser session still responds to commands."""
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _reset(self, driver: Any) -> bool:
+        """Clear cookies, storage and the current page between leases."""
+        try:
+            try:
+                driver.execute_script(
+                    "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+                )
+            except Exception:
+                pass
+
+            if hasattr(driver, "execute_cdp_cmd"):
+                # Clears cookies for every domain, not only the current one
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+                driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            else:
+                driver.delete_all_cookies()
+
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            print(f"Error resetting browser session: {str(e)}")
+            return False
+
+    def _quit(self, pooled: _PooledDriver) -> None:
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            print(f"Error quitting browser session: {str(e)}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return pool counters and the number of idle sessions."""
+        with self._lock:
+            return {**self.stats, "idle": len(self._idle), "size": self.size}
+
+    def shutdown(self) -> None:
+        """Quit every idle driver; drivers still leased are quit on return."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+
+        for pooled in idle:
+            self._quit(pooled)
+
+
+_pool: Optional[DriverPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(factory: Callable[[], Any]) -> DriverPool:
+    """Return the process-wide driver pool, creating it with `factory` on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool(factory)
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Shut down the process-wide driver pool if one was created."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
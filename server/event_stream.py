@@ -0,0 +1,38 @@
+"""
+Encoders for progress streams (server-sent events or NDJSON).
+
+Each progress event is a phase name plus a JSON payload. As SSE it becomes
+an "event:"/"data:" block that EventSource dispatches by phase; as NDJSON
+it becomes one object per line with the phase under "event".
+"""
+from typing import Any, Dict
+
+from serialization import dumps
+
+STREAM_FORMATS = {
+    "sse": "text/event-stream",
+    "ndjson": "application/x-ndjson",
+}
+
+# Keep proxies from buffering the stream and clients from caching it
+STREAM_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def encode_event(phase: str, data: Dict[str, Any], fmt: str) -> bytes:
+    """
+    Encode one progress event.
+
+    Args:
+        phase: Event name
+        data: JSON-serializable payload
+        fmt: A key of STREAM_FORMATS
+
+    Returns:
+        The encoded event, ready to be written to the response
+    """
+    if fmt == "ndjson":
+        return dumps({"event": phase, **data}) + b"\n"
+    return b"event: " + phase.encode("utf-8") + b"\ndata: " + dumps(data) + b"\n\n"
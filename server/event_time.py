@@ -0,0 +1,108 @@
+"""
+Normalization of scraped event times to UTC.
+
+Every source reports a calendar date and a wall-clock time in its own
+timezone: CashbackForex renders times in the browser's (i.e. the scraping
+host's) timezone on a 24h clock, ForexFactory in its site timezone on a 12h
+clock ("8:30am"). to_utc combines both into a timezone-aware UTC datetime so
+events from different sources can be sorted and range-queried together.
+"""
+import os
+import re
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+import pytz
+
+# Timezone of each source's calendar times: an IANA name, or "local" for the
+# timezone of the machine running the scraper
+SOURCE_TIMEZONES = {
+    "CashbackForex": os.getenv("CASHBACKFOREX_TIMEZONE", "local"),
+    "ForexFactory": os.getenv("FOREXFACTORY_TIMEZONE", "America/New_York"),
+}
+# Used for sources without an entry above
+DEFAULT_SOURCE_TIMEZONE = os.getenv("DEFAULT_SOURCE_TIMEZONE", "UTC")
+
+# "8:30am", "8am", "12:00 p.m."
+_CLOCK_12H_RE = re.compile(r"^(\d{1,2})(?::(\d{2}))?\s*([ap])\.?\s*m\.?$", re.IGNORECASE)
+# "13:45", "13:45:00"
+_CLOCK_24H_RE = re.compile(r"^(\d{1,2}):(\d{2})(?::\d{2})?$")
+# "0830", "830"
+_CLOCK_DIGITS_RE = re.compile(r"^(\d{1,2})(\d{2})$")
+
+
+def parse_clock(time_str: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Parse a calendar time into (hour, minute) on a 24h clock.
+
+    Args:
+        time_str: Time as displayed by the source
+
+    Returns:
+        (hour, minute), or None for empty or non-clock values ("All Day",
+        "Tentative", "Day 2", ...)
+    """
+    if not time_str:
+        return None
+    text = time_str.strip()
+
+    match = _CLOCK_12H_RE.match(text)
+    if match:
+        hour, minute = int(match.group(1)), int(match.group(2) or 0)
+        if not 1 <= hour <= 12:
+            return None
+        # 12am is midnight, 12pm is noon
+        hour = hour % 12 + (12 if match.group(3).lower() == "p" else 0)
+    else:
+        match = _CLOCK_24H_RE.match(text) or _CLOCK_DIGITS_RE.match(text)
+        if not match:
+            return None
+        hour, minute = int(match.group(1)), int(match.group(2))
+
+    if hour > 23 or minute > 59:
+        return None
+    return hour, minute
+
+
+def source_timezone(source: Optional[str]) -> str:
+    """Return the configured timezone name for a source."""
+    return SOURCE_TIMEZONES.get(source, DEFAULT_SOURCE_TIMEZONE)
+
+
+def to_utc(date_str: Optional[str], time_str: Optional[str], source: Optional[str] = None) -> Optional[datetime]:
+    """
+    Convert a source's calendar date and time to a timezone-aware UTC datetime.
+
+    Events without a clock time ("All Day", "Tentative") are placed at the
+    start of their day in the source's timezone.
+
+    Args:
+        date_str: Date in YYYY-MM-DD format
+        time_str: Time as displayed by the source
+        source: Source name, selecting the timezone (see SOURCE_TIMEZONES)
+
+    Returns:
+        UTC datetime, or None if the date cannot be parsed
+    """
+    if not date_str:
+        return None
+    try:
+        local = datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError:
+        return None
+
+    clock = parse_clock(time_str)
+    if clock:
+        local = local.replace(hour=clock[0], minute=clock[1])
+
+    tz_name = source_timezone(source)
+    if tz_name == "local":
+        # A naive datetime is interpreted in the host's timezone
+        return local.astimezone(timezone.utc)
+    try:
+        tz = pytz.timezone(tz_name)
+    except pytz.UnknownTimeZoneError:
+        print(f"Unknown timezone '{tz_name}' for source '{source}', using UTC")
+        tz = pytz.utc
+    # Nonexistent/ambiguous DST wall times resolve to standard time
+    return tz.localize(local, is_dst=False).astimezone(timezone.utc)
@@ -0,0 +1,75 @@
+"""
+Chunked NDJSON / CSV encoders for streaming event exports.
+
+Each encoder pulls documents from an iterator (normally
+EconomicCalendarDB.iter_events) and yields one bytes chunk per batch, so
+only a single batch is ever held in memory.
+"""
+import csv
+import io
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, Sequence
+
+from serialization import dumps
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _batches(documents: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[list]:
+    iterator = iter(documents)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_ndjson(documents: Iterable[Dict[str, Any]], fields: Sequence[str], batch_size: int) -> Iterator[bytes]:
+    """
+    Encode documents as newline-delimited JSON objects.
+
+    Args:
+        documents: Event documents
+        fields: Fields written for each event, in order
+        batch_size: Documents per yielded chunk
+
+    Yields:
+        NDJSON chunks
+    """
+    for batch in _batches(documents, batch_size):
+        yield b"".join(dumps({field: document.get(field) for field in fields}) + b"\n" for document in batch)
+
+
+def iter_csv(documents: Iterable[Dict[str, Any]], fields: Sequence[str], batch_size: int) -> Iterator[bytes]:
+    """
+    Encode documents as CSV with a header row; missing values are left empty.
+
+    Args:
+        documents: Event documents
+        fields: Columns, in order
+        batch_size: Documents per yielded chunk
+
+    Yields:
+        CSV chunks, the first one starting with the header
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for batch in _batches(documents, batch_size):
+        writer.writerows([document.get(field) for field in fields] for document in batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, for an empty result
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def encode_export(documents: Iterable[Dict[str, Any]], fields: Sequence[str], fmt: str, batch_size: int) -> Iterator[bytes]:
+    """Return the chunk iterator for export format `fmt` (a key of EXPORT_FORMATS)."""
+    if fmt == "csv":
+        return iter_csv(documents, fields, batch_size)
+    return iter_ndjson(documents, fields, batch_size)
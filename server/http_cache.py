@@ -0,0 +1,111 @@
+"""
+Conditional GET support for the polling endpoints.
+
+Responses carry a strong ETag (a hash of the serialized result set) and a
+Last-Modified header taken from the newest `updatedAt` in the result. A
+client that sends back a matching If-None-Match (or an If-Modified-Since that
+is not older than Last-Modified) gets an empty 304 instead of the payload.
+"""
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional, Union
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from serialization import RawJSONResponse
+
+# Clients may keep the response but must revalidate it before every reuse
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(payload: Union[str, bytes, Any]) -> str:
+    """
+    Build a strong ETag for a response payload.
+
+    Args:
+        payload: Already-serialized body (str/bytes) or a JSON-serializable object
+
+    Returns:
+        Quoted ETag value
+    """
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    elif not isinstance(payload, bytes):
+        payload = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    return '"' + hashlib.sha256(payload).hexdigest()[:32] + '"'
+
+
+def newest_updated_at(documents: Iterable[Dict[str, Any]]) -> Optional[datetime]:
+    """Return the most recent `updatedAt` of the documents, if any has one."""
+    newest = None
+    for document in documents:
+        updated_at = document.get("updatedAt")
+        if isinstance(updated_at, datetime) and (newest is None or updated_at > newest):
+            newest = updated_at
+    return newest
+
+
+def _to_utc(value: datetime) -> datetime:
+    # Naive datetimes were written with datetime.now(), i.e. server local time
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    candidates = (tag.strip() for tag in header.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates if tag)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Evaluate the request's conditional headers against the current representation.
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted when
+    the client did not send an ETag.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return _to_utc(last_modified) <= since
+    return False
+
+
+def conditional_response(request: Request,
+                         body: bytes,
+                         etag: str,
+                         last_modified: Optional[datetime] = None) -> Response:
+    """
+    Return a 304 if the client's copy is current, otherwise the JSON payload.
+
+    Both responses carry the ETag, Last-Modified and Cache-Control headers.
+
+    Args:
+        request: Incoming request with the conditional headers
+        body: Serialized JSON response body (see serialization.dumps)
+        etag: Strong ETag of `body` (see make_etag)
+        last_modified: Newest updatedAt in the result set
+
+    Returns:
+        Response with status 304 or 200
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_to_utc(last_modified), usegmt=True)
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return RawJSONResponse(content=body, headers=headers)
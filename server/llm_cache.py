@@ -0,0 +1,44 @@
+"""
+Content-addressed keys for cached LLM responses.
+
+A response is reusable exactly when the request that produced it would be
+identical: same model, same prompt template version and same input events
+for the same day. The key hashes those inputs after canonicalizing the
+events (sorted keys, order-independent), so re-fetching the same events in a
+different order still hits.
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Union
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def llm_cache_key(model: str,
+                  prompt_version: Union[int, str],
+                  events: List[Dict[str, Any]],
+                  day: str,
+                  context: Optional[Any] = None) -> str:
+    """
+    Hash the inputs of an LLM signal request.
+
+    Args:
+        model: Model name the prompt is sent to
+        prompt_version: Version of the prompt template
+        events: Events passed to the prompt (extract_source_data output)
+        day: Date the prompt is generated for, in YYYY-MM-DD format
+        context: Anything else the prompt includes (e.g. the previous signal set)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = _canonical({
+        "model": model,
+        "prompt_version": prompt_version,
+        "day": day,
+        "events": sorted(_canonical(event) for event in events),
+        "context": context,
+    })
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
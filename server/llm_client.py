@@ -0,0 +1,388 @@
+"""
+Provider-agnostic async LLM client.
+
+All providers share one pooled aiohttp session (the Gemini SDK client is
+created once and handed the same session). Every call has a hard timeout and
+is retried with exponential backoff on timeouts, connection errors, 429 and
+5xx responses. Providers are tried in LLM_PROVIDERS order: the next one
+starts as soon as the current one has failed (failover) or, when
+LLM_HEDGE_DELAY is set, once the current one has been pending that long
+(hedging); the first success wins and the other calls are cancelled.
+stream_generate yields the answer chunk by chunk instead, failing over only
+until the first chunk has arrived.
+
+Base URLs are configurable so the client can run against a local fake server:
+
+    GEMINI_BASE_URL=http://127.0.0.1:9000 OPENROUTER_BASE_URL=http://127.0.0.1:9000/api/v1
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import aiohttp
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+# Unset means the SDK's default endpoint
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") or None
+OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "deepseek/deepseek-chat-v3-0324:free")
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+
+# Providers in order of preference
+LLM_PROVIDERS = [name.strip() for name in os.getenv("LLM_PROVIDERS", "gemini,openrouter").split(",") if name.strip()]
+# Seconds one attempt may take before it is abandoned
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+# Extra attempts per provider after the first, and the base backoff between them
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", "0.5"))
+# Start the next provider after this many seconds without an answer; 0 disables
+# hedging, so the next provider only starts once the current one has failed
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "0"))
+# Maximum open connections in the shared session
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "20"))
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """A provider returned an error or an unusable response."""
+
+
+class RetryableLLMError(LLMError):
+    """A transient provider error worth retrying (rate limit, 5xx)."""
+
+
+class LLMStreamStalled(LLMError):
+    """A streamed answer stopped sending chunks for LLM_TIMEOUT after it had started."""
+
+
+class LLMUnavailable(LLMError):
+    """Every provider failed; `errors` maps provider name to its last error."""
+
+    def __init__(self, errors: Dict[str, str]):
+        super().__init__(f"All LLM providers failed: {errors}" if errors else "No LLM provider is configured")
+        self.errors = errors
+
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session, creating it on first use."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=LLM_POOL_SIZE),
+            timeout=aiohttp.ClientTimeout(total=LLM_TIMEOUT),
+        )
+    return _session
+
+
+async def close_llm_client() -> None:
+    """Close the shared session and drop cached SDK clients (called on shutdown)."""
+    global _session
+    session, _session = _session, None
+    for provider in _providers.values():
+        provider.reset()
+    if session is not None and not session.closed:
+        await session.close()
+
+
+class OpenRouterProvider:
+    """OpenAI-compatible chat completions API of OpenRouter."""
+
+    name = "openrouter"
+
+    def __init__(self, model: str = OPENROUTER_MODEL, base_url: str = OPENROUTER_BASE_URL,
+                 api_key: Optional[str] = None):
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key or os.getenv("OPENROUTER_API_KEY")
+
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def reset(self) -> None:
+        pass
+
+    async def generate(self, session: aiohttp.ClientSession, prompt: str) -> str:
+        async with session.post(
+            f"{self.base_url}/chat/completions",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json={"model": self.model, "messages": [{"role": "user", "content": prompt}]},
+        ) as response:
+            if response.status in RETRYABLE_STATUS:
+                raise RetryableLLMError(f"HTTP {response.status}: {(await response.text())[:200]}")
+            if response.status != 200:
+                raise LLMError(f"HTTP {response.status}: {(await response.text())[:200]}")
+            body = await response.json(content_type=None)
+        try:
+            return body["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            raise LLMError(f"Unexpected response: {str(body)[:200]}")
+
+    async def stream(self, session: aiohttp.ClientSession, prompt: str) -> AsyncIterator[str]:
+        # No total timeout: a long answer may stream for a while, but each read must arrive in time
+        async with session.post(
+            f"{self.base_url}/chat/completions",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json={"model": self.model, "messages": [{"role": "user", "content": prompt}], "stream": True},
+            timeout=aiohttp.ClientTimeout(total=None, sock_read=LLM_TIMEOUT),
+        ) as response:
+            if response.status in RETRYABLE_STATUS:
+                raise RetryableLLMError(f"HTTP {response.status}: {(await response.text())[:200]}")
+            if response.status != 200:
+                raise LLMError(f"HTTP {response.status}: {(await response.text())[:200]}")
+            # Server-sent events; lines starting with ":" are keep-alive comments
+            async for line in response.content:
+                line = line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                try:
+                    chunk = json.loads(data)
+                except ValueError:
+                    continue
+                if "error" in chunk:
+                    raise LLMError(f"Stream error: {str(chunk['error'])[:200]}")
+                choices = chunk.get("choices") or [{}]
+                text = (choices[0].get("delta") or {}).get("content")
+                if text:
+                    yield text
+
+
+class GeminiProvider:
+    """Gemini through the google-genai SDK, sharing the pooled aiohttp session."""
+
+    name = "gemini"
+
+    def __init__(self, model: str = GEMINI_MODEL, base_url: Optional[str] = GEMINI_BASE_URL,
+                 api_key: Optional[str] = None):
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key or os.getenv("GENAI_API_KEY")
+        self._client = None
+        self._client_session = None
+
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def reset(self) -> None:
+        self._client = None
+        self._client_session = None
+
+    def _get_client(self, session: aiohttp.ClientSession):
+        # Built once per session; the SDK is imported only when Gemini is used
+        if self._client is None or self._client_session is not session:
+            from google import genai
+            from google.genai import types
+
+            self._client = genai.Client(
+                api_key=self.api_key,
+                http_options=types.HttpOptions(
+                    base_url=self.base_url,
+                    timeout=int(LLM_TIMEOUT * 1000),
+                    aiohttp_client=session,
+                ),
+            )
+            self._client_session = session
+        return self._client
+
+    @staticmethod
+    def _error(e) -> LLMError:
+        if e.code in RETRYABLE_STATUS:
+            return RetryableLLMError(f"HTTP {e.code}: {e.message}")
+        return LLMError(f"HTTP {e.code}: {e.message}")
+
+    async def generate(self, session: aiohttp.ClientSession, prompt: str) -> str:
+        from google.genai import errors
+
+        client = self._get_client(session)
+        try:
+            response = await client.aio.models.generate_content(model=self.model, contents=prompt)
+        except errors.APIError as e:
+            raise self._error(e) from e
+        return response.text
+
+    async def stream(self, session: aiohttp.ClientSession, prompt: str) -> AsyncIterator[str]:
+        from google.genai import errors
+
+        client = self._get_client(session)
+        try:
+            async for chunk in await client.aio.models.generate_content_stream(model=self.model, contents=prompt):
+                if chunk.text:
+                    yield chunk.text
+        except errors.APIError as e:
+            raise self._error(e) from e
+
+
+PROVIDER_CLASSES = {
+    "gemini": GeminiProvider,
+    "openrouter": OpenRouterProvider,
+}
+
+_providers: Dict[str, Any] = {}
+
+
+def get_providers(names: Optional[List[str]] = None) -> List[Any]:
+    """Return the shared provider instances for `names` that have credentials."""
+    providers = []
+    for name in names or LLM_PROVIDERS:
+        if name not in PROVIDER_CLASSES:
+            print(f"Unknown LLM provider '{name}' ignored")
+            continue
+        if name not in _providers:
+            _providers[name] = PROVIDER_CLASSES[name]()
+        if _providers[name].available():
+            providers.append(_providers[name])
+    return providers
+
+
+async def _generate_with_retries(provider, session: aiohttp.ClientSession, prompt: str) -> str:
+    """Call one provider with a hard timeout per attempt and exponential backoff."""
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            text = await asyncio.wait_for(provider.generate(session, prompt), LLM_TIMEOUT)
+            if not text:
+                raise RetryableLLMError("Empty response")
+            return text
+        except (RetryableLLMError, asyncio.TimeoutError, aiohttp.ClientError) as e:
+            if attempt == LLM_MAX_RETRIES:
+                raise
+            delay = LLM_RETRY_BACKOFF * (2 ** attempt) * (1 + random.random() / 2)
+            print(f"{provider.name} attempt {attempt + 1} failed ({type(e).__name__}: {e}), retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+
+async def generate(prompt: str,
+                   providers: Optional[List[Any]] = None,
+                   hedge_delay: float = LLM_HEDGE_DELAY) -> Dict[str, Any]:
+    """
+    Send a prompt to the configured providers and return the first answer.
+
+    Args:
+        prompt: Prompt text
+        providers: Providers to use, in order (defaults to get_providers())
+        hedge_delay: Seconds before the next provider is started alongside a
+            slow one; 0 starts it only after a failure
+
+    Returns:
+        Dictionary with the response text, provider and model names, and
+        elapsed milliseconds
+
+    Raises:
+        LLMUnavailable: If no provider is configured or every provider failed
+    """
+    queue = list(providers if providers is not None else get_providers())
+    if not queue:
+        raise LLMUnavailable({})
+
+    session = await get_session()
+    start = time.perf_counter()
+    errors: Dict[str, str] = {}
+    pending: Dict[asyncio.Task, Any] = {}
+
+    def launch():
+        provider = queue.pop(0)
+        pending[asyncio.ensure_future(_generate_with_retries(provider, session, prompt))] = provider
+
+    launch()
+    try:
+        while pending:
+            timeout = hedge_delay if hedge_delay > 0 and queue else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # Hedge: the running provider is slow, race the next one against it
+                launch()
+                continue
+            for task in done:
+                provider = pending.pop(task)
+                try:
+                    text = task.result()
+                except Exception as e:
+                    errors[provider.name] = f"{type(e).__name__}: {e}"
+                    print(f"LLM provider {provider.name} failed: {errors[provider.name]}")
+                    if queue:
+                        launch()
+                    continue
+                return {
+                    "text": text,
+                    "provider": provider.name,
+                    "model": provider.model,
+                    "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+                }
+    finally:
+        for task in pending:
+            task.cancel()
+    raise LLMUnavailable(errors)
+
+
+async def stream_generate(prompt: str, providers: Optional[List[Any]] = None) -> AsyncIterator[Dict[str, str]]:
+    """
+    Stream the answer of the first provider that starts answering.
+
+    Providers are retried and failed over only until their first chunk
+    arrives; once text has been yielded, an error ends the stream. Every
+    chunk must arrive within LLM_TIMEOUT; a stall after the first chunk ends
+    the stream with LLMStreamStalled. Closing the generator closes the provider's
+    connection.
+
+    Args:
+        prompt: Prompt text
+        providers: Providers to use, in order (defaults to get_providers())
+
+    Yields:
+        Dictionaries with the "text" chunk and the "provider" and "model" names
+
+    Raises:
+        LLMUnavailable: If no provider is configured or none started answering
+        LLMStreamStalled: If the answer stalls after its first chunk
+        LLMError: If the answer fails otherwise after its first chunk
+    """
+    queue = list(providers if providers is not None else get_providers())
+    if not queue:
+        raise LLMUnavailable({})
+
+    session = await get_session()
+    errors: Dict[str, str] = {}
+    for provider in queue:
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            chunks = provider.stream(session, prompt)
+            started = False
+            try:
+                while True:
+                    try:
+                        text = await asyncio.wait_for(chunks.__anext__(), LLM_TIMEOUT)
+                    except StopAsyncIteration:
+                        break
+                    started = True
+                    yield {"text": text, "provider": provider.name, "model": provider.model}
+                if started:
+                    return
+                raise RetryableLLMError("Empty response")
+            except (LLMError, asyncio.TimeoutError, aiohttp.ClientError) as e:
+                if started:
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise LLMStreamStalled(f"{provider.name} stream stalled: no chunk for {LLM_TIMEOUT:g}s") from e
+                    raise
+                errors[provider.name] = f"{type(e).__name__}: {e}"
+                retryable = not isinstance(e, LLMError) or isinstance(e, RetryableLLMError)
+                if retryable and attempt < LLM_MAX_RETRIES:
+                    delay = LLM_RETRY_BACKOFF * (2 ** attempt) * (1 + random.random() / 2)
+                    print(f"{provider.name} stream attempt {attempt + 1} failed ({errors[provider.name]}), "
+                          f"retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                print(f"LLM provider {provider.name} failed: {errors[provider.name]}")
+                break
+            finally:
+                await chunks.aclose()
+    raise LLMUnavailable(errors)
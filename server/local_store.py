@@ -0,0 +1,218 @@
+"""
+Append-only local store for scraped events.
+
+Each store is a directory of JSONL segments. Scrapes append only the events
+they produced, so a write costs O(new events) no matter how much history has
+accumulated. Compaction rewrites the segments into one, keeping the latest
+copy of every event key. It runs automatically once most stored records are
+superseded copies (repeated scrapes of the same calendar) or too many
+segments pile up, and can be run by hand:
+
+    python local_store.py compact [store ...]
+    python local_store.py import <store> <legacy.json>
+"""
+import argparse
+import glob
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+LOCAL_STORE_DIR = os.getenv("LOCAL_STORE_DIR", "data_store")
+# Start a new segment once the active one grows past this size
+SEGMENT_MAX_BYTES = int(os.getenv("LOCAL_STORE_SEGMENT_MAX_BYTES", str(4 * 1024 * 1024)))
+# Compact automatically once a store has this many segments
+COMPACT_AFTER_SEGMENTS = int(os.getenv("LOCAL_STORE_COMPACT_AFTER_SEGMENTS", "8"))
+# ...or once fewer than this fraction of its records are the latest copy of
+# their key, provided it holds at least COMPACT_MIN_RECORDS records
+COMPACT_LIVE_RATIO = float(os.getenv("LOCAL_STORE_COMPACT_LIVE_RATIO", "0.5"))
+COMPACT_MIN_RECORDS = int(os.getenv("LOCAL_STORE_COMPACT_MIN_RECORDS", "1000"))
+
+
+def event_key(event: Dict[str, Any]) -> str:
+    """Key identifying an event across scrapes."""
+    return f"{event.get('source')}_{event.get('date')}_{event.get('time')}_{event.get('country')}_{event.get('event')}"
+
+
+class EventStore:
+    """Keyed, append-only event log stored as JSONL segments."""
+
+    def __init__(self, name: str,
+                 root: str = LOCAL_STORE_DIR,
+                 segment_max_bytes: int = SEGMENT_MAX_BYTES,
+                 compact_after_segments: int = COMPACT_AFTER_SEGMENTS,
+                 compact_live_ratio: float = COMPACT_LIVE_RATIO,
+                 compact_min_records: int = COMPACT_MIN_RECORDS):
+        self.name = name
+        self.path = os.path.join(root, name)
+        self.segment_max_bytes = segment_max_bytes
+        self.compact_after_segments = compact_after_segments
+        self.compact_live_ratio = compact_live_ratio
+        self.compact_min_records = compact_min_records
+        self._lock = threading.Lock()
+        # Distinct keys and total records on disk, loaded on the first append
+        self._live_keys: Optional[set] = None
+        self._record_count = 0
+
+    def _segments(self):
+        return sorted(glob.glob(os.path.join(self.path, "segment-*.jsonl")))
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.path, f"segment-{number:06d}.jsonl")
+
+    def _segment_number(self, path: str) -> int:
+        return int(os.path.basename(path)[len("segment-"):-len(".jsonl")])
+
+    def _active_segment(self) -> str:
+        segments = self._segments()
+        if not segments:
+            return self._segment_path(1)
+        last = segments[-1]
+        if os.path.getsize(last) >= self.segment_max_bytes:
+            return self._segment_path(self._segment_number(last) + 1)
+        return last
+
+    def append(self, events: Iterable[Dict[str, Any]]) -> int:
+        """
+        Append events to the active segment.
+
+        Args:
+            events: Event dictionaries
+
+        Returns:
+            Number of events written
+        """
+        events = list(events)
+        lines = [json.dumps(event, ensure_ascii=False) + "\n" for event in events]
+        if not lines:
+            return 0
+
+        with self._lock:
+            if self._live_keys is None:
+                self._load_counts()
+            os.makedirs(self.path, exist_ok=True)
+            with open(self._active_segment(), "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+            self._live_keys.update(event_key(event) for event in events)
+            self._record_count += len(lines)
+            segment_count = len(self._segments())
+            mostly_superseded = (self._record_count >= self.compact_min_records and
+                                 len(self._live_keys) < self._record_count * self.compact_live_ratio)
+
+        if segment_count > self.compact_after_segments or mostly_superseded:
+            self.compact()
+        return len(lines)
+
+    def _load_counts(self) -> None:
+        self._live_keys = set()
+        self._record_count = 0
+        for record in self._iter_records(self._segments()):
+            self._live_keys.add(event_key(record))
+            self._record_count += 1
+
+    def _iter_records(self, segments) -> Iterator[Dict[str, Any]]:
+        for segment in segments:
+            with open(segment, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from an interrupted write
+                        print(f"Skipping corrupt line in {segment}")
+
+    def iter_events(self) -> Iterator[Dict[str, Any]]:
+        """Yield the latest copy of every stored event."""
+        latest: Dict[str, Dict[str, Any]] = {}
+        for record in self._iter_records(self._segments()):
+            latest[event_key(record)] = record
+        return iter(latest.values())
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Rewrite all segments into one, deduplicated by event key.
+
+        Returns:
+            Counts of segments and records before and after compaction
+        """
+        with self._lock:
+            segments = self._segments()
+            if not segments:
+                return {"segments": 0, "records_before": 0, "records_after": 0}
+
+            latest: Dict[str, Dict[str, Any]] = {}
+            records_before = 0
+            for record in self._iter_records(segments):
+                records_before += 1
+                latest[event_key(record)] = record
+
+            # Write the compacted segment under a new number, then drop the old ones
+            target = self._segment_path(self._segment_number(segments[-1]) + 1)
+            tmp_path = target + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for record in latest.values():
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, target)
+            for segment in segments:
+                os.remove(segment)
+            self._live_keys = set(latest)
+            self._record_count = len(latest)
+
+        return {"segments": len(segments), "records_before": records_before, "records_after": len(latest)}
+
+    def import_json(self, filename: str) -> int:
+        """Append the events of a legacy JSON array file (data.json / data_forex.json)."""
+        with open(filename, "r", encoding="utf-8") as f:
+            events = json.load(f)
+        for event in events:
+            event.setdefault("source", "CashbackForex")
+        return self.append(events)
+
+
+_stores: Dict[str, EventStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_event_store(name: str, root: Optional[str] = None) -> EventStore:
+    """Return the shared EventStore called `name`."""
+    root = root or LOCAL_STORE_DIR
+    with _stores_lock:
+        key = os.path.join(root, name)
+        if key not in _stores:
+            _stores[key] = EventStore(name, root=root)
+        return _stores[key]
+
+
+def _store_names(root: str):
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the local scraped-event stores")
+    parser.add_argument("--root", default=LOCAL_STORE_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compact = commands.add_parser("compact", help="Deduplicate stores by event key")
+    compact.add_argument("stores", nargs="*", help="Store names (default: all)")
+
+    import_cmd = commands.add_parser("import", help="Import a legacy JSON array file")
+    import_cmd.add_argument("store")
+    import_cmd.add_argument("filename")
+
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        for name in args.stores or _store_names(args.root):
+            result = get_event_store(name, args.root).compact()
+            print(f"{name}: {result}")
+    elif args.command == "import":
+        count = get_event_store(args.store, args.root).import_json(args.filename)
+        print(f"Imported {count} events into {args.store}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,74 @@
-from fastapi import FastAPI, Query
-from scraper import scrape_cashback_forex
-from scraper import forex_factory_scraper
+from fastapi import FastAPI, Query, Request
+from driver_pool import shutdown_pool
 from utils.getToday import get_today_data
 from utils.getSourceData import extract_source_data
-from signal_generator import analyze_with_ai, clean_json_response, analyze_signal_gemeni
-from utils.transformEvents import transform_economic_events
+from utils.signalDiff import diff_events, event_key, merge_signals, snapshot_events
+from utils.signalShards import combine_shard_signals, shard_events
+from utils.transformEvents import EVENT_FIELDS, transform_economic_events
+from pagination import decode_cursor, page_cursor
+import asyncio
 import concurrent.futures
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from db import EconomicCalendarDB, SignalDB, JSONEncoder
-from datetime import datetime
+from async_db import AsyncEconomicCalendarDB, AsyncLLMResponseCacheDB, AsyncSignalDB, shutdown_db_executor
+from llm_cache import llm_cache_key
+from db import EVENT_SORT_KEYS, EXPORT_BATCH_SIZE
+from export import EXPORT_FORMATS, encode_export
+from event_stream import STREAM_FORMATS, STREAM_HEADERS, encode_event
+from signal_parser import SignalParseError, SignalStreamParser
+from mongo import close_client
+from response_cache import ResponseCache, events_cache_key
+from http_cache import conditional_response, make_etag, newest_updated_at
+from serialization import ORJSONResponse, dumps
+from datetime import datetime, timezone
 import os
+import sys
 import json
-from bson.json_util import dumps
+import time
 
-app = FastAPI()
-calendar_db = EconomicCalendarDB()
-signals_db = SignalDB()
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Page size of /events when the client does not pass limit, and the largest it may ask for
+EVENTS_DEFAULT_LIMIT = int(os.getenv("EVENTS_DEFAULT_LIMIT", "1000"))
+EVENTS_MAX_LIMIT = int(os.getenv("EVENTS_MAX_LIMIT", "5000"))
+# Sharded /generate-signals: target events per prompt and prompts in flight at once
+SIGNAL_SHARD_SIZE = int(os.getenv("SIGNAL_SHARD_SIZE", "25"))
+SIGNAL_SHARD_CONCURRENCY = int(os.getenv("SIGNAL_SHARD_CONCURRENCY", "4"))
+# Default time limit of a /generate-signals/stream run, in seconds
+SIGNAL_STREAM_TIMEOUT = float(os.getenv("SIGNAL_STREAM_TIMEOUT", "180"))
+
+def get_scraper():
+    """Import the Selenium scraping stack on first use of a /scrape route."""
+    import scraper
+    return scraper
+
+def get_signal_generator():
+    """Import the prompt builders on first use of /generate-signals."""
+    import signal_generator
+    return signal_generator
+
+def get_llm_client():
+    """Import the async LLM client (aiohttp, google-genai) on first use of /generate-signals."""
+    import llm_client
+    return llm_client
+
+async def load_signal_modules():
+    """
+    Return the signal_generator and llm_client modules, importing them in a worker thread.
+    
+    The first import of google-genai and aiohttp takes hundreds of milliseconds
+    and would otherwise stall every request on the event loop.
+    """
+    return await app.state.loop.run_in_executor(None, lambda: (get_signal_generator(), get_llm_client()))
+
+# Blocking pymongo calls run in a dedicated thread pool so they never stall the event loop
+calendar_db = AsyncEconomicCalendarDB()
+signals_db = AsyncSignalDB()
+llm_cache_db = AsyncLLMResponseCacheDB()
+# /events and /events/stats responses, invalidated whenever save_events writes new data
+events_cache = ResponseCache()
+stats_cache = ResponseCache()
 
 #define cors
 origins = [
@@ -30,6 +82,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified"],
 )
 
 
@@ -37,29 +90,76 @@ app.add_middleware(
 async def root():
     return {"message": "Welcome to the Economic Calendar API"}
 
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Treat a query datetime without an offset as UTC."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+def select_event_fields(fields: Optional[List[str]]) -> tuple:
+    """
+    Validate a fields= query parameter (repeated or comma-separated).
+    
+    Returns the selected fields in EVENT_FIELDS order so the output shape does
+    not depend on the order they were requested in; all fields by default.
+    """
+    if not fields:
+        return EVENT_FIELDS
+    fields = {field.strip() for value in fields for field in value.split(",") if field.strip()}
+    unknown = sorted(fields - set(EVENT_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(field for field in EVENT_FIELDS if field in fields)
+
 @app.get("/events")
 async def get_events(
+    request: Request,
     start_date: Optional[str] = Query(None, description="Filter by start date (YYYY-MM-DD format)"),
     end_date: Optional[str] = Query(None, description="Filter by end date (YYYY-MM-DD format)"),
     countries: Optional[List[str]] = Query(None, description="Filter by country"),
     impact: Optional[List[str]] = Query(None, description="Filter by impact"),
     sources: Optional[List[str]] = Query(None, description="Filter by source"),
+    start_time: Optional[datetime] = Query(None, description="Only events at or after this time (ISO 8601, UTC if no offset)"),
+    end_time: Optional[datetime] = Query(None, description="Only events before this time (ISO 8601, UTC if no offset)"),
+    limit: Optional[int] = Query(None, ge=1, le=EVENTS_MAX_LIMIT, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    fields: Optional[List[str]] = Query(None, description="Fields to return (repeated or comma-separated)"),
 ):
     try:
         print(f"Filtering with: start_date={start_date}, end_date={end_date}, countries={countries}, impact={impact}, sources={sources}")
-        events = calendar_db.get_events(
+        limit = limit or EVENTS_DEFAULT_LIMIT
+        selected = select_event_fields(fields)
+        after = decode_cursor(cursor, EVENT_SORT_KEYS) if cursor else None
+        
+        cache_key = events_cache_key(start_date, end_date, countries, impact, sources, selected, limit, cursor, start_time, end_time)
+        # Read the version before querying so a concurrent write invalidates this entry
+        version = calendar_db.data_version
+        cached = events_cache.get(cache_key, version)
+        if cached is not None:
+            body, etag, last_modified = cached
+            return conditional_response(request, body, etag, last_modified)
+        
+        events = await calendar_db.get_events(
             start_date=start_date,
             end_date=end_date,
             countries=countries,
             impact=impact,
-            sources=sources
+            sources=sources,
+            start_time=as_utc(start_time),
+            end_time=as_utc(end_time),
+            fields=selected + ("updatedAt",),
+            limit=limit,
+            after=after
         )
-        # Convert MongoDB objects to JSON using your custom encoder
-        serialized_events = JSONEncoder().encode(events)
-        # Parse back to Python objects before returning
-        events_data = json.loads(serialized_events)
-        # Transform to desired format
-        return transform_economic_events(events_data)
+        # Transform to desired format and serialize once; the bytes are what gets cached
+        response = transform_economic_events(events, selected)
+        response["count"] = len(events)
+        response["next_cursor"] = page_cursor(events, limit, EVENT_SORT_KEYS)
+        body = dumps(response)
+        etag = make_etag(body)
+        last_modified = newest_updated_at(events)
+        events_cache.set(cache_key, version, (body, etag, last_modified))
+        return conditional_response(request, body, etag, last_modified)
     except Exception as e:
         return {
             "status": "error",
@@ -68,14 +168,105 @@ async def get_events(
             "details": str(e)
         }
 
+@app.get("/events/export")
+async def export_events(
+    start_date: Optional[str] = Query(None, description="Filter by start date (YYYY-MM-DD format)"),
+    end_date: Optional[str] = Query(None, description="Filter by end date (YYYY-MM-DD format)"),
+    countries: Optional[List[str]] = Query(None, description="Filter by country"),
+    impact: Optional[List[str]] = Query(None, description="Filter by impact"),
+    sources: Optional[List[str]] = Query(None, description="Filter by source"),
+    start_time: Optional[datetime] = Query(None, description="Only events at or after this time (ISO 8601, UTC if no offset)"),
+    end_time: Optional[datetime] = Query(None, description="Only events before this time (ISO 8601, UTC if no offset)"),
+    fields: Optional[List[str]] = Query(None, description="Fields to export (repeated or comma-separated)"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    batch_size: Optional[int] = Query(None, ge=1, le=EVENTS_MAX_LIMIT, description="Events fetched and written per chunk"),
+):
+    try:
+        selected = select_event_fields(fields)
+        batch_size = batch_size or EXPORT_BATCH_SIZE
+        documents = calendar_db.sync.iter_events(
+            start_date=start_date,
+            end_date=end_date,
+            countries=countries,
+            impact=impact,
+            sources=sources,
+            start_time=as_utc(start_time),
+            end_time=as_utc(end_time),
+            fields=selected,
+            batch_size=batch_size
+        )
+        # Starlette pulls each chunk from this sync iterator in a worker thread,
+        # so the cursor never blocks the event loop and only one batch is in memory
+        return StreamingResponse(
+            encode_export(documents, selected, format, batch_size),
+            media_type=EXPORT_FORMATS[format],
+            headers={"Content-Disposition": f'attachment; filename="events.{format}"'}
+        )
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": "Failed to export events",
+            "error_type": type(e).__name__,
+            "details": str(e)
+        }
+
+@app.get("/events/stats")
+async def get_event_stats(
+    request: Request,
+    start_date: Optional[str] = Query(None, description="Filter by start date (YYYY-MM-DD format)"),
+    end_date: Optional[str] = Query(None, description="Filter by end date (YYYY-MM-DD format)"),
+    countries: Optional[List[str]] = Query(None, description="Filter by country"),
+    impact: Optional[List[str]] = Query(None, description="Filter by impact"),
+    sources: Optional[List[str]] = Query(None, description="Filter by source"),
+    start_time: Optional[datetime] = Query(None, description="Only events at or after this time (ISO 8601, UTC if no offset)"),
+    end_time: Optional[datetime] = Query(None, description="Only events before this time (ISO 8601, UTC if no offset)"),
+):
+    try:
+        cache_key = events_cache_key(start_date, end_date, countries, impact, sources,
+                                     start_time=start_time, end_time=end_time)
+        version = calendar_db.data_version
+        cached = stats_cache.get(cache_key, version)
+        if cached is not None:
+            body, etag = cached
+            return conditional_response(request, body, etag)
+        
+        stats = await calendar_db.get_event_stats(
+            start_date=start_date,
+            end_date=end_date,
+            countries=countries,
+            impact=impact,
+            sources=sources,
+            start_time=as_utc(start_time),
+            end_time=as_utc(end_time)
+        )
+        body = dumps({"status": "success", **stats})
+        etag = make_etag(body)
+        stats_cache.set(cache_key, version, (body, etag))
+        return conditional_response(request, body, etag)
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": "Failed to compute event statistics",
+            "error_type": type(e).__name__,
+            "details": str(e)
+        }
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return {
+        "status": "success",
+        "events": events_cache.stats(),
+        "event_stats": stats_cache.stats()
+    }
 
 
 @app.get("/scrape/cashbackforex")
 async def scrape():
     try:
         with concurrent.futures.ThreadPoolExecutor() as executor:
+            timings = {}
             data = await app.state.loop.run_in_executor(
-                executor, lambda: scrape_cashback_forex())
+                executor, lambda: get_scraper().scrape_cashback_forex(timings=timings))
             
             events = json.loads(data)
             # Filter today's data
@@ -85,11 +276,12 @@ async def scrape():
             # todays_data = get_today_data(events)
             # with open('todays_data.json', 'w') as f:
             #     json.dump(todays_data, f, indent=4)
-            result = calendar_db.save_events(events)
+            result = await calendar_db.save_events(events)
             return {
                 "status": "success", 
                 "data": events, 
-                "db_result": result
+                "db_result": result,
+                "timings": timings
             }
     except Exception as e:
         return {
@@ -103,8 +295,9 @@ async def scrape():
 async def scrape():
     try:
         with concurrent.futures.ThreadPoolExecutor() as executor:
+            timings = {}
             data = await app.state.loop.run_in_executor(
-                executor, lambda: forex_factory_scraper())
+                executor, lambda: get_scraper().forex_factory_scraper(timings=timings))
             
             events = json.loads(data)
             # # Filter today's data
@@ -113,11 +306,12 @@ async def scrape():
             # Filter today's data
             todays_data = get_today_data(events)
             print("Tidays Data", todays_data)
-            result = calendar_db.save_events(todays_data)
+            result = await calendar_db.save_events(todays_data)
             return {
                 "status": "success", 
                 "data": todays_data, 
-                "db_result": result
+                "db_result": result,
+                "timings": timings
             }
     except Exception as e:
         return {
@@ -128,84 +322,268 @@ async def scrape():
         }
     
 
-@app.get("/generate-signals")
-async def generate_signals():
-    try:
-        # Fetch economic events from the database
-        economic_events = calendar_db.get_events()
-        todays_data = get_today_data(economic_events)
+async def load_prompt_events(current_date, incremental):
+    """
+    Load the day's events and, in incremental mode, pick the ones that changed.
+    
+    Args:
+        current_date: Day to generate signals for
+        incremental: Diff against the event snapshot stored with the day's signal set
+    
+    Returns:
+        Tuple of all events, the events to send, the previous signal set
+        ({"market_summary", "signals"}, or None for a full run) and the
+        stored signal set document
+    """
+    todays_data = await calendar_db.get_events_for_day(current_date, fields=EVENT_FIELDS)
+    events_for_ai = extract_source_data(todays_data)
+    
+    # Incremental mode: diff against the snapshot stored with today's signal set
+    # and send only new/changed releases plus the previous summary as context.
+    # Signals may rest on a release that has since been removed, and merging
+    # would keep them, so any removal falls back to a full run.
+    previous = None
+    stored = None
+    prompt_events = events_for_ai
+    if incremental:
+        stored = await signals_db.get_signal_set(current_date)
+        if stored and stored.get("event_snapshot") is not None:
+            changed, removed = diff_events(events_for_ai, stored["event_snapshot"])
+            if removed:
+                print(f"{len(removed)} events removed since the last signal set, regenerating in full")
+            else:
+                previous = {
+                    "market_summary": stored.get("market_summary", ""),
+                    "signals": stored.get("signals", [])
+                }
+                prompt_events = changed
+    return events_for_ai, prompt_events, previous, stored
 
-        # print(economic_events)
-        serialized_events = JSONEncoder().encode(todays_data)
-        events = json.loads(serialized_events)
+def signal_prompt_key(events, previous, current_date, providers, currencies=None):
+    """
+    Return the LLM cache key of a prompt, with the model chain and prompt version it covers.
+    
+    Identical inputs (models, prompt version, events, day, context) reuse the stored response.
+    """
+    signal_generator = get_signal_generator()
+    models = ",".join(f"{provider.name}:{provider.model}" for provider in providers)
+    prompt_version = (signal_generator.PROMPT_VERSION if previous is None
+                      else f"incremental-{signal_generator.INCREMENTAL_PROMPT_VERSION}")
+    if currencies:
+        prompt_version = f"{prompt_version}-shard-{signal_generator.SHARD_PROMPT_VERSION}"
+    return llm_cache_key(models, prompt_version, events, current_date, context=previous), models, prompt_version
 
-        
-        events_for_ai = extract_source_data(events)
-        # print(f"Events for AI: {events_for_ai}")
-        
-                
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            ai_response = await app.state.loop.run_in_executor(
-                executor, lambda: analyze_signal_gemeni(events_for_ai))
-                
-        if not ai_response:
+async def run_signal_prompt(events, previous, current_date, providers, refresh=False, currencies=None):
+    """
+    Get the signals for one prompt, reusing the cached LLM response for identical inputs.
+    
+    Args:
+        events: Events to analyze (extract_source_data output)
+        previous: Stored signal set to update (incremental mode), or None
+        current_date: Day the events belong to
+        providers: LLM providers to try, in order
+        refresh: Ignore the cached response
+        currencies: Currencies of a prompt shard, or None for a single prompt
+    
+    Returns:
+        Dictionary with the parsed "analysis", the "provider" that answered
+        and "cache" hit information
+    
+    Raises:
+        LLMUnavailable: If every provider failed
+        SignalResponseError: If the response is not a valid signals document
+    """
+    signal_generator = get_signal_generator()
+    llm = get_llm_client()
+    
+    cache_key, models, prompt_version = signal_prompt_key(events, previous, current_date, providers, currencies)
+    cached = None if refresh else await llm_cache_db.get_response(cache_key)
+    
+    if cached:
+        ai_response = cached["response"]
+        provider = cached.get("provider")
+    else:
+        # Pooled session, hard timeouts, retries and failover between providers
+        prompt = signal_generator.build_signal_prompt(events, previous, currencies)
+        llm_result = await llm.generate(prompt, providers)
+        ai_response = llm_result["text"]
+        provider = llm_result["provider"]
+    
+    analysis = signal_generator.parse_signal_response(ai_response)
+    
+    # Only complete responses that parsed into valid signals are worth reusing
+    if not cached and not analysis["truncated"]:
+        await llm_cache_db.save_response(
+            cache_key,
+            ai_response,
+            model=models,
+            provider=provider,
+            prompt_version=prompt_version,
+            event_count=len(events)
+        )
+    return {
+        "analysis": analysis,
+        "provider": provider,
+        "truncated": analysis["truncated"],
+        "cache": {"hit": cached is not None, "key": cache_key}
+    }
+
+async def save_generated_signals(analysis, previous, current_date, snapshot_source, save=True):
+    """
+    Store a generated signal set as the day's signals.
+    
+    Args:
+        analysis: Parsed {"market_summary", "signals"}
+        previous: Signal set the analysis updates (incremental mode), or None
+        current_date: Day of the signal set
+        snapshot_source: Events the stored signals now cover
+        save: False only builds the set, leaving the stored one in place
+            (used for truncated responses)
+    
+    Returns:
+        Tuple of the signal set as returned to clients and the save result
+        (None when not saved)
+    """
+    market_summary = analysis.get("market_summary", "")
+    signals = analysis.get("signals", [])
+    if previous is not None:
+        # Signals for pairs the changes did not touch stay as they were
+        signals = merge_signals(previous["signals"], signals)
+        market_summary = market_summary or previous["market_summary"]
+    
+    if not save:
+        return {
+            "market_summary": market_summary,
+            "signals": signals,
+            "date": current_date,
+            "timestamp": datetime.now().isoformat()
+        }, None
+    
+    # Use save_signals method instead of save_signal
+    # This handles complete signal data with market summary and signals array
+    signals_data = {
+        "market_summary": market_summary,
+        "signals": signals,
+        "date": current_date,
+        "timestamp": datetime.now().isoformat(),
+        # What the next incremental run diffs against
+        "event_snapshot": snapshot_events(snapshot_source)
+    }
+    
+    # Save to MongoDB using the SignalDB class
+    result = await signals_db.save_signals(signals_data)
+    return {
+        "market_summary": market_summary,
+        "signals": signals,
+        "date": current_date,
+        "timestamp": datetime.now().isoformat()
+    }, result
+
+@app.get("/generate-signals")
+async def generate_signals(
+    refresh: bool = Query(False, description="Ignore the cached LLM response"),
+    incremental: bool = Query(False, description="Only send events that changed since the stored signal set"),
+    sharded: bool = Query(False, description="Split the events into concurrent per-currency prompts"),
+):
+    try:
+        # Fetch today's economic events from the database
+        current_date = datetime.now().strftime('%Y-%m-%d')
+        events_for_ai, prompt_events, previous, stored = await load_prompt_events(current_date, incremental)
+        if previous is not None and not prompt_events:
             return {
-                "status": "error",
-                "message": "Failed to get response from AI"
+                "status": "success",
+                "message": "No event changes since the last signal set",
+                "mode": "incremental",
+                "changed_events": 0,
+                "signals": {**previous, "date": current_date, "timestamp": stored.get("timestamp")}
             }
+        mode = "incremental" if previous is not None else "full"
         
-        # print (f"AI Response: {ai_response}")
-
- 
-        cleaned_content = clean_json_response(ai_response)
-
-        print(f"Cleaned Content: {cleaned_content}")
-
+        signal_generator, llm = await load_signal_modules()
+        providers = llm.get_providers()
         
-        try:
-            # Parse JSON
-            analysis_json = json.loads(cleaned_content)
+        if not sharded:
+            try:
+                prompt_result = await run_signal_prompt(prompt_events, previous, current_date, providers, refresh)
+            except llm.LLMUnavailable as e:
+                return {
+                    "status": "error",
+                    "message": "Failed to get response from AI",
+                    "details": e.errors
+                }
+            except signal_generator.SignalResponseError as e:
+                return {
+                    "status": "error",
+                    "message": "Failed to parse AI response as JSON",
+                    "error": str(e),
+                    "raw_content": e.raw_content,
+                    "cleaned_content": e.cleaned_content
+                }
+            analysis = prompt_result["analysis"]
+            generation_info = {"cache": prompt_result["cache"], "provider": prompt_result["provider"]}
+            snapshot_source = events_for_ai
+            truncated = prompt_result["truncated"]
+        else:
+            # One prompt per group of currencies, run concurrently; the slowest
+            # shard rather than the whole day bounds the latency
+            shards = shard_events(prompt_events, SIGNAL_SHARD_SIZE)
+            semaphore = asyncio.Semaphore(SIGNAL_SHARD_CONCURRENCY)
             
-            # Validate the JSON structure
-            if 'signals' not in analysis_json or not isinstance(analysis_json['signals'], list):
-                raise ValueError("Invalid JSON structure: 'signals' key is missing or not a list")
-                
-            # Add timestamp and date
-            current_date = datetime.now().strftime('%Y-%m-%d')
+            async def run_shard(shard):
+                async with semaphore:
+                    return await run_signal_prompt(shard["events"], previous, current_date, providers, refresh,
+                                                   currencies=shard["currencies"])
             
-            # Use save_signals method instead of save_signal
-            # This handles complete signal data with market summary and signals array
-            signals_data = {
-                "market_summary": analysis_json.get("market_summary", ""),
-                "signals": analysis_json.get("signals", []),
-                "date": current_date,
-                "timestamp": datetime.now().isoformat()
-            }
+            outcomes = await asyncio.gather(*(run_shard(shard) for shard in shards), return_exceptions=True)
             
-            # Save to MongoDB using the SignalDB class
-            result = signals_db.save_signals(signals_data)
+            shard_info = []
+            succeeded = []
+            failed_events = []
+            for shard, outcome in zip(shards, outcomes):
+                info = {"currencies": shard["currencies"], "events": len(shard["events"])}
+                if isinstance(outcome, Exception):
+                    info.update(status="error", error_type=type(outcome).__name__, details=str(outcome))
+                    failed_events.extend(shard["events"])
+                elif outcome["truncated"]:
+                    # Only part of the shard's signals came back; treat it as failed
+                    info.update(status="error", error_type="TruncatedResponse", provider=outcome["provider"],
+                                details="The AI response was cut off")
+                    failed_events.extend(shard["events"])
+                else:
+                    info.update(status="success", cache=outcome["cache"], provider=outcome["provider"])
+                    succeeded.append((shard["currencies"], outcome["analysis"]))
+                shard_info.append(info)
             
-            # Return a JSON-serializable response
-            return {
-                "status": "success",
-                "message": "Signals generated and saved",
-                "db_result": result,
-                "signals": {
-                    "market_summary": analysis_json.get("market_summary", ""),
-                    "signals": analysis_json.get("signals", []),
-                    "date": current_date,
-                    "timestamp": datetime.now().isoformat()
+            if not succeeded:
+                return {
+                    "status": "error",
+                    "message": "Failed to get response from AI",
+                    "shards": shard_info
                 }
-            }
-            
-        except json.JSONDecodeError as e:
-            return {
-                "status": "error",
-                "message": "Failed to parse AI response as JSON",
-                "error": str(e),
-                "raw_content": ai_response,
-                "cleaned_content": cleaned_content
-            }
+            analysis = combine_shard_signals(succeeded)
+            generation_info = {"shards": shard_info, "partial": bool(failed_events)}
+            # Events of failed shards stay out of the snapshot, so the next
+            # incremental run picks them up again
+            failed_keys = {event_key(event) for event in failed_events}
+            snapshot_source = [event for event in events_for_ai if event_key(event) not in failed_keys]
+            truncated = False
+        
+        # A truncated response would replace the day's set with a partial one
+        signal_set, result = await save_generated_signals(analysis, previous, current_date, snapshot_source,
+                                                          save=not truncated)
+        
+        # Return a JSON-serializable response
+        return {
+            "status": "success",
+            "message": ("The AI response was cut off; signals from its complete part were not saved"
+                        if truncated else "Signals generated and saved"),
+            "truncated": truncated,
+            "db_result": result,
+            **generation_info,
+            "mode": mode,
+            "changed_events": len(prompt_events),
+            "signals": signal_set
+        }
             
     except Exception as e:
         return {
@@ -215,24 +593,146 @@ async def generate_signals():
             "details": str(e)
         }
 
+async def stream_signal_generation(request, refresh, incremental, fmt, timeout):
+    """
+    Run a signal generation and yield its progress as encoded stream events.
+    
+    Phases, in order: events_loaded, prompt_built, tokens (per received
+    chunk), signal (per signal, as soon as it is parsed), persisted (skipped
+    for a truncated response, which is not stored), done; error ends the
+    stream early. The run stops, closing the LLM connection,
+    when the client disconnects or `timeout` seconds have passed; a
+    provider that stops sending chunks mid-answer is reported separately.
+    """
+    start = time.perf_counter()
+    deadline = start + timeout
+    
+    def event(phase, **data):
+        return encode_event(phase, data, fmt)
+    
+    try:
+        signal_generator, llm = await load_signal_modules()
+    except Exception as e:
+        yield event("error", message="Signal generation failed", error_type=type(e).__name__, details=str(e))
+        return
+    
+    def elapsed_ms():
+        return round((time.perf_counter() - start) * 1000, 1)
+    
+    try:
+        current_date = datetime.now().strftime('%Y-%m-%d')
+        events_for_ai, prompt_events, previous, stored = await load_prompt_events(current_date, incremental)
+        mode = "incremental" if previous is not None else "full"
+        yield event("events_loaded", date=current_date, events=len(events_for_ai),
+                    changed_events=len(prompt_events), mode=mode, elapsed_ms=elapsed_ms())
+        if previous is not None and not prompt_events:
+            yield event("done", status="success", message="No event changes since the last signal set",
+                        signals={**previous, "date": current_date, "timestamp": stored.get("timestamp")},
+                        elapsed_ms=elapsed_ms())
+            return
+        
+        providers = llm.get_providers()
+        cache_key, models, prompt_version = signal_prompt_key(prompt_events, previous, current_date, providers)
+        cached = None if refresh else await llm_cache_db.get_response(cache_key)
+        prompt = signal_generator.build_signal_prompt(prompt_events, previous)
+        yield event("prompt_built", chars=len(prompt), cache={"hit": cached is not None, "key": cache_key},
+                    elapsed_ms=elapsed_ms())
+        
+        parser = SignalStreamParser()
+        provider = cached.get("provider") if cached else None
+        if cached:
+            for signal in parser.feed(cached["response"]):
+                yield event("signal", signal=signal)
+        else:
+            chunks = llm.stream_generate(prompt, providers)
+            received = 0
+            try:
+                while True:
+                    if await request.is_disconnected():
+                        print("Signal stream client disconnected, cancelling generation")
+                        return
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), remaining)
+                    except StopAsyncIteration:
+                        break
+                    provider = chunk["provider"]
+                    received += len(chunk["text"])
+                    yield event("tokens", provider=provider, text=chunk["text"], chars=received,
+                                elapsed_ms=elapsed_ms())
+                    for signal in parser.feed(chunk["text"]):
+                        yield event("signal", signal=signal)
+            finally:
+                # Closes the provider connection when the run stops early
+                await chunks.aclose()
+        
+        try:
+            analysis = parser.close()
+        except SignalParseError as e:
+            yield event("error", message="Failed to parse AI response as JSON", details=str(e),
+                        raw_content=parser.text)
+            return
+        if not cached and not analysis["truncated"]:
+            await llm_cache_db.save_response(
+                cache_key,
+                parser.text,
+                model=models,
+                provider=provider,
+                prompt_version=prompt_version,
+                event_count=len(prompt_events)
+            )
+        
+        # A truncated response would replace the day's set with a partial one
+        signal_set, result = await save_generated_signals(analysis, previous, current_date, events_for_ai,
+                                                          save=not analysis["truncated"])
+        if result is not None:
+            yield event("persisted", db_result=result, elapsed_ms=elapsed_ms())
+        yield event("done", status="success", provider=provider, mode=mode, changed_events=len(prompt_events),
+                    truncated=analysis["truncated"], signals=signal_set, elapsed_ms=elapsed_ms())
+    
+    except asyncio.TimeoutError:
+        yield event("error", message=f"Signal generation timed out after {timeout:g}s", error_type="TimeoutError")
+    except llm.LLMUnavailable as e:
+        yield event("error", message="Failed to get response from AI", details=e.errors)
+    except llm.LLMStreamStalled as e:
+        # The answer stopped mid-stream before the run deadline
+        yield event("error", message="AI response stalled", error_type=type(e).__name__, details=str(e))
+    except Exception as e:
+        yield event("error", message="Signal generation failed", error_type=type(e).__name__, details=str(e))
+
+@app.get("/generate-signals/stream")
+async def generate_signals_stream(
+    request: Request,
+    refresh: bool = Query(False, description="Ignore the cached LLM response"),
+    incremental: bool = Query(False, description="Only send events that changed since the stored signal set"),
+    format: str = Query("sse", pattern="^(sse|ndjson)$", description="sse or ndjson"),
+    timeout: float = Query(SIGNAL_STREAM_TIMEOUT, gt=0, description="Seconds before the run is cancelled"),
+):
+    # Same generation as /generate-signals, reported phase by phase
+    return StreamingResponse(
+        stream_signal_generation(request, refresh, incremental, format, timeout),
+        media_type=STREAM_FORMATS[format],
+        headers=STREAM_HEADERS
+    )
+
 @app.get("/signals")
-async def get_signals(date: Optional[str] = Query(None, description="Filter by date (YYYY-MM-DD format)")):
+async def get_signals(request: Request, date: Optional[str] = Query(None, description="Filter by date (YYYY-MM-DD format)")):
     try:
         # Get signals using the SignalDB class
         if date:
-            signals = signals_db.get_signals(start_date=date, end_date=date)
+            signals = await signals_db.get_signals(start_date=date, end_date=date)
         else:
-            signals = signals_db.get_signals()
+            signals = await signals_db.get_signals()
             
-        # Convert MongoDB objects for JSON response using JSON encoder
-        serialized_signals = JSONEncoder().encode(signals)
-        signals_response = json.loads(serialized_signals)
-        
-        return {
+        # Serialize the Mongo documents (ObjectId, datetime) straight to bytes
+        body = dumps({
             "status": "success",
             "count": len(signals),
-            "signals": signals_response
-        }
+            "signals": signals
+        })
+        return conditional_response(request, body, make_etag(body), newest_updated_at(signals))
     except Exception as e:
         return {
             "status": "error",
@@ -250,19 +750,24 @@ async def scrape_all():
         # Use concurrent execution to run both scrapers in parallel
         with concurrent.futures.ThreadPoolExecutor() as executor:
             # Start both scraping tasks
-            cashback_future = executor.submit(scrape_cashback_forex)
-            forexfactory_future = executor.submit(forex_factory_scraper)
+            cashback_timings = {}
+            forexfactory_timings = {}
+            # The first Selenium import is slow; keep it off the event loop
+            scraper = await app.state.loop.run_in_executor(executor, get_scraper)
+            cashback_future = executor.submit(scraper.scrape_cashback_forex, timings=cashback_timings)
+            forexfactory_future = executor.submit(scraper.forex_factory_scraper, timings=forexfactory_timings)
             
             # Process Cashback Forex data
             try:
-                cashback_data = cashback_future.result()
+                cashback_data = await asyncio.wrap_future(cashback_future)
                 cashback_events = json.loads(cashback_data)
                 cashback_today = get_today_data(cashback_events)
-                cashback_result = calendar_db.save_events(cashback_today)
+                cashback_result = await calendar_db.save_events(cashback_today)
                 results["cashbackforex"] = {
                     "status": "success", 
                     "data_count": len(cashback_today),
-                    "db_result": cashback_result
+                    "db_result": cashback_result,
+                    "timings": cashback_timings
                 }
             except Exception as e:
                 errors["cashbackforex"] = {
@@ -274,14 +779,15 @@ async def scrape_all():
             
             # Process Forex Factory data
             try:
-                forexfactory_data = forexfactory_future.result()
+                forexfactory_data = await asyncio.wrap_future(forexfactory_future)
                 forexfactory_events = json.loads(forexfactory_data)
                 forexfactory_today = get_today_data(forexfactory_events)
-                forexfactory_result = calendar_db.save_events(forexfactory_today)
+                forexfactory_result = await calendar_db.save_events(forexfactory_today)
                 results["forexfactory"] = {
                     "status": "success", 
                     "data_count": len(forexfactory_today),
-                    "db_result": forexfactory_result
+                    "db_result": forexfactory_result,
+                    "timings": forexfactory_timings
                 }
             except Exception as e:
                 errors["forexfactory"] = {
@@ -291,14 +797,14 @@ async def scrape_all():
                     "details": str(e)
                 }
         
-        # Combine all scraped events
-        all_events = calendar_db.get_events()
+        # Count all stored events without loading them
+        total_events = await calendar_db.count_events()
         
         return {
             "status": "complete" if not errors else "partial",
             "results": results,
             "errors": errors if errors else None,
-            "total_events_saved": len(all_events),
+            "total_events_saved": total_events,
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
@@ -312,8 +818,42 @@ async def scrape_all():
 
 @app.on_event("startup")
 async def startup_event():
-    import asyncio
     app.state.loop = asyncio.get_running_loop()
+    # Index checks and cache warm-up run in the background so they never delay
+    # the first request
+    app.state.prepare_db_task = asyncio.create_task(prepare_database())
+
+async def prepare_database():
+    try:
+        created = (await calendar_db.ensure_indexes() + await signals_db.ensure_indexes()
+                   + await llm_cache_db.ensure_indexes())
+        print(f"Created {created} missing indexes")
+    except Exception as e:
+        print(f"Error creating indexes: {str(e)}")
+    
+    # Warm the change-detection cache so unchanged events are never rewritten
+    try:
+        loaded = await calendar_db.warm_fingerprint_cache()
+        print(f"Loaded {loaded} event fingerprints")
+    except Exception as e:
+        print(f"Error warming fingerprint cache: {str(e)}")
+    
+    # Compute derived fields (UTC timestamp, numeric values) of older documents
+    try:
+        backfilled = await calendar_db.backfill_derived_fields()
+        print(f"Backfilled derived fields of {backfilled} events")
+    except Exception as e:
+        print(f"Error backfilling derived fields: {str(e)}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Quit the pooled browser sessions so no Chrome processes outlive the app
+    shutdown_pool()
+    await shutdown_db_executor()
+    close_client()
+    # Only loaded once /generate-signals has run
+    if "llm_client" in sys.modules:
+        await sys.modules["llm_client"].close_llm_client()
 
 if __name__ == "__main__":
     import uvicorn
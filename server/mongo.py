@@ -0,0 +1,92 @@
+"""
+Process-wide MongoDB connection management.
+
+One MongoClient (and therefore one connection pool) is shared by every DB
+class in the process. Pool size and timeouts come from the environment.
+"""
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+# Load environment variables from .env file
+load_dotenv()
+
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "10000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "10000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
+
+IndexKeys = Union[str, List[Tuple[str, int]]]
+IndexSpec = Tuple[IndexKeys, Dict[str, Any]]
+
+_client: Optional[MongoClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> MongoClient:
+    """
+    Return the shared MongoClient, creating it on first use.
+
+    The client connects lazily, so creating it does not block on the server.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = MongoClient(
+                os.getenv("URI", "mongodb://localhost:27017"),
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+            )
+        return _client
+
+
+def get_database(name: Optional[str] = None):
+    """Return a database handle on the shared client (defaults to MONGODB_DB)."""
+    return get_client()[name or os.getenv("MONGODB_DB", "forex_scraper")]
+
+
+def close_client() -> None:
+    """Close the shared client (called on application shutdown)."""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
+
+
+def _normalize_keys(keys: IndexKeys) -> Tuple[Tuple[str, int], ...]:
+    if isinstance(keys, str):
+        return ((keys, 1),)
+    return tuple((field, int(direction)) for field, direction in keys)
+
+
+def ensure_indexes(collection, specs: Sequence[IndexSpec]) -> int:
+    """
+    Create the indexes in `specs` that the collection does not have yet.
+
+    Existing indexes are read with a single list_indexes call, so nothing
+    else is sent to the server when every index already exists.
+
+    Args:
+        collection: pymongo Collection
+        specs: (keys, options) pairs as accepted by create_index
+
+    Returns:
+        Number of indexes created
+    """
+    existing = {_normalize_keys(list(index["key"].items())) for index in collection.list_indexes()}
+
+    created = 0
+    for keys, options in specs:
+        if _normalize_keys(keys) in existing:
+            continue
+        collection.create_index(keys, **options)
+        created += 1
+    return created
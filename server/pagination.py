@@ -0,0 +1,83 @@
+"""
+Keyset (cursor) pagination helpers for Mongo queries.
+
+A page ends at the sort key of its last document. The cursor handed to the
+client is that key, encoded with bson.json_util so ObjectId and datetime
+values survive the round trip. The next page asks Mongo for documents
+strictly after that key, so every page costs one index range scan no matter
+how deep into the result set it is.
+"""
+import base64
+import binascii
+from typing import Any, Dict, Optional, Sequence
+
+from bson import json_util
+
+
+def encode_cursor(document: Dict[str, Any], keys: Sequence[str]) -> str:
+    """
+    Encode the sort key of `document` as an opaque, URL-safe cursor.
+
+    Args:
+        document: Last document of the current page
+        keys: Sort key fields, in sort order
+
+    Returns:
+        Cursor string
+    """
+    raw = json_util.dumps([document.get(key) for key in keys]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[str]) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string from a previous page
+        keys: Sort key fields, in sort order
+
+    Returns:
+        Dictionary mapping each key field to its value
+
+    Raises:
+        ValueError: If the cursor is malformed or was built for other keys
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json_util.loads(raw.decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return dict(zip(keys, values))
+
+
+def keyset_filter(after: Dict[str, Any], keys: Sequence[str]) -> Dict[str, Any]:
+    """
+    Build a filter matching documents that sort strictly after `after`.
+
+    All keys are assumed ascending. Null (or missing) values sort first in
+    Mongo, so a null key value is followed by every non-null value.
+
+    Args:
+        after: Sort key of the last document already returned
+        keys: Sort key fields, in sort order
+
+    Returns:
+        Mongo filter ({"$or": [...]})
+    """
+    clauses = []
+    for i, key in enumerate(keys):
+        clause: Dict[str, Any] = {prefix: after[prefix] for prefix in keys[:i]}
+        value = after[key]
+        clause[key] = {"$ne": None} if value is None else {"$gt": value}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+def page_cursor(documents: Sequence[Dict[str, Any]], limit: Optional[int], keys: Sequence[str]) -> Optional[str]:
+    """Return the cursor of the next page, or None if `documents` was the last page."""
+    if not limit or len(documents) < limit:
+        return None
+    return encode_cursor(documents[-1], keys)
@@ -0,0 +1,653 @@
+"""
+HTML parser backends for the economic calendar pages.
+
+Every backend turns the raw calendar HTML into the same list of event
+dictionaries; de-duplication and persistence stay in scraper.py. The
+backend is selected with the PARSER_BACKEND environment variable
+("lxml", "selectolax" or "bs4").
+"""
+import os
+from itertools import islice
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax is optional
+    LexborHTMLParser = None
+
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", "lxml")
+# Parse calendar pages row by row with an lxml pull parser instead of
+# building the whole tree first
+PARSER_STREAMING = os.getenv("PARSER_STREAMING", "false").lower() in ("1", "true", "yes")
+# Characters fed to the pull parser at a time in streaming mode
+STREAM_CHUNK_SIZE = int(os.getenv("PARSER_STREAM_CHUNK_SIZE", "65536"))
+
+
+def _cashback_date(timestamp: Optional[str]) -> Optional[str]:
+    """Derive the event date from the row's Unix timestamp (seconds)."""
+    try:
+        ts = int(timestamp) if timestamp else 0
+        return datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+    except Exception:
+        return None
+
+
+def _cashback_impact(classes: List[str]) -> Optional[str]:
+    for cls in classes:
+        if cls.startswith("ec-fx-impact-"):
+            return cls.split("ec-fx-impact-")[-1]
+    return None
+
+
+def _forex_factory_impact(classes: List[str]) -> Optional[str]:
+    if "icon--ff-impact-red" in classes:
+        return "high"
+    elif "icon--ff-impact-ora" in classes:
+        return "medium"
+    elif "icon--ff-impact-yel" in classes:
+        return "low"
+    return None
+
+
+def _day_breaker_date(date_text: str) -> str:
+    """
+    Parse the text of a ForexFactory day breaker row into YYYY-MM-DD.
+
+    Raises:
+        ValueError: If the text is not a recognizable date
+    """
+    # Clean up the date text - handle formats like "SunApr Apr 18"
+    if "Apr" in date_text and date_text.count("Apr") > 1:
+        # There's a duplicate month name, get just the last part
+        parts = date_text.split()
+        month_day = " ".join(parts[-2:]) if len(parts) >= 2 else date_text
+    else:
+        month_day = date_text.strip()
+
+    year = datetime.now().year
+    # Create a cleaner date string
+    date_str = f"{month_day} {year}"
+
+    # Try different formats for parsing
+    for fmt in ["%b %d %Y", "%B %d %Y"]:
+        try:
+            return datetime.strptime(date_str, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            pass
+    raise ValueError(f"Could not parse date: {date_str}")
+
+
+def _date_cell_date(month_day: str) -> str:
+    """Parse the "Apr 21" text of a ForexFactory date cell into YYYY-MM-DD."""
+    year = datetime.now().year
+    return datetime.strptime(f"{month_day} {year}", "%b %d %Y").strftime("%Y-%m-%d")
+
+
+def _event(date, event_time, country, event_name, impact, actual, forecast, previous, source) -> Dict[str, Any]:
+    return {
+        "date": date,
+        "time": event_time,
+        "country": country,
+        "event": event_name,
+        "impact": impact,
+        "actual": actual,
+        "forecast": forecast,
+        "previous": previous,
+        "source": source,
+    }
+
+
+class ForexFactoryRowState:
+    """Date carried from day breaker and date cells to the rows that follow."""
+
+    def __init__(self):
+        self.current_date = datetime.now().strftime('%Y-%m-%d')  # Default to today
+
+
+def _collect_forex_factory(backend, rows) -> List[Dict[str, Any]]:
+    """Run the backend's row parser over all rows, skipping rows that fail."""
+    state = ForexFactoryRowState()
+    events = []
+    for row in rows:
+        try:
+            event = backend.parse_forex_factory_row(row, state)
+        except Exception as e:
+            print(f"Error processing event row: {str(e)}")
+            continue
+        if event:
+            events.append(event)
+    return events
+
+
+class BeautifulSoupBackend:
+    """Reference backend using BeautifulSoup with the stdlib html.parser."""
+
+    name = "bs4"
+
+    def parse_cashback_forex(self, content: str) -> List[Dict[str, Any]]:
+        soup = BeautifulSoup(content, "html.parser")
+        events = []
+
+        # Select all event rows (based on the class attribute in the row)
+        for row in soup.select("tr.ec-fx-table-event-row"):
+            # Skip rows that don't have proper structure
+            if not row.get("time") or not row.select_one("div.timeString"):
+                continue
+
+            date_str = _cashback_date(row.get("time"))
+
+            tds = row.find_all("td")
+            if len(tds) < 3:
+                continue
+
+            # First column: extract time and actual value
+            td1 = tds[0]
+            time_div = td1.find("div", class_="timeString")
+            event_time = time_div.get_text(strip=True) if time_div else None
+            actual_div = td1.find("div", class_="actual_div")
+            actual_text = actual_div.get_text(strip=True) if actual_div else ""
+
+            # Second column: extract country and forecast value
+            td2 = tds[1]
+            country_span = td2.find("span")
+            country = country_span.get_text(strip=True) if country_span else None
+            consensus_div = td2.find("div", class_="consensus_div")
+            forecast_text = consensus_div.get_text(strip=True) if consensus_div else ""
+
+            # Third column: extract event name, impact and previous value
+            td3 = tds[2]
+            impact_div = td3.find("div", class_=lambda x: x and "ec-fx-impact" in x)
+            impact = _cashback_impact(impact_div.get("class")) if impact_div else None
+
+            # Event name: find the text that's directly in the flex div
+            flex_div = td3.find("div", style=lambda s: s and "flex: 1" in s)
+            if flex_div:
+                event_name = " ".join(t.strip() for t in flex_div.stripped_strings if t.strip())
+            else:
+                event_name = td3.get_text(strip=True)
+
+            previous_div = td3.find("div", class_="previous_div")
+            previous_text = previous_div.get_text(strip=True) if previous_div else ""
+
+            events.append(_event(
+                date_str, event_time, country, event_name, impact,
+                actual_text or None, forecast_text or None, previous_text or None,
+                "CashbackForex",
+            ))
+
+        return events
+
+    def parse_forex_factory(self, content: str) -> List[Dict[str, Any]]:
+        soup = BeautifulSoup(content, "html.parser")
+        return _collect_forex_factory(self, soup.select("tr"))
+
+    def parse_forex_factory_row(self, row, state: ForexFactoryRowState) -> Optional[Dict[str, Any]]:
+        classes = row.get("class", [])
+
+        # Day breaker rows only carry the date for the rows that follow
+        if "calendar__row--day-breaker" in classes:
+            date_span = row.find("span")
+            if date_span:
+                date_text = date_span.get_text(strip=True)
+                try:
+                    state.current_date = _day_breaker_date(date_text)
+                except Exception as e:
+                    print(f"Error parsing day breaker date: {str(e)}")
+                    print(f"Raw date text: '{date_text}' from {date_span}")
+            return None
+
+        # Skip rows that aren't calendar events
+        if "calendar__row" not in classes:
+            return None
+
+        # Regular rows may repeat the date; otherwise the day breaker date is kept
+        date_cell = row.find("td", class_="calendar__date")
+        if date_cell:
+            date_span = date_cell.find("span", class_="date")
+            if date_span:
+                try:
+                    month_day = date_span.find("span")
+                    if month_day:
+                        state.current_date = _date_cell_date(month_day.get_text(strip=True))
+                except Exception as e:
+                    print(f"Error parsing date cell: {str(e)}")
+
+        time_cell = row.find("td", class_="calendar__time")
+        event_time = (time_cell.get_text(strip=True) or None) if time_cell else None
+
+        currency_cell = row.find("td", class_="calendar__currency")
+        country = currency_cell.get_text(strip=True) if currency_cell else None
+
+        event_cell = row.find("td", class_="calendar__event")
+        event_name = None
+        if event_cell:
+            event_title = event_cell.find("span", class_="calendar__event-title")
+            if event_title:
+                event_name = event_title.get_text(strip=True)
+
+        if not (state.current_date and country and event_name):
+            return None
+
+        impact_cell = row.find("td", class_="calendar__impact")
+        impact = None
+        if impact_cell:
+            impact_icon = impact_cell.find("span", class_=lambda c: c and "icon--ff-impact" in c)
+            if impact_icon:
+                impact = _forex_factory_impact(impact_icon.get("class", []))
+
+        values = []
+        for cell_class in ("calendar__actual", "calendar__forecast", "calendar__previous"):
+            value = None
+            cell = row.find("td", class_=cell_class)
+            if cell:
+                span = cell.find("span")
+                if span:
+                    value = span.get_text(strip=True) or None
+            values.append(value)
+
+        return _event(state.current_date, event_time, country, event_name, impact, *values, "ForexFactory")
+
+
+def _xpath_class(name: str) -> str:
+    """XPath predicate matching elements that have `name` as one of their classes."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class LxmlBackend:
+    """Backend using libxml2's HTML parser and precompiled XPath expressions."""
+
+    name = "lxml"
+
+    _texts = etree.XPath(".//text()", smart_strings=False)
+    _cb_rows = etree.XPath(f"//tr[{_xpath_class('ec-fx-table-event-row')}]")
+    _cb_time_string = etree.XPath(f".//div[{_xpath_class('timeString')}]")
+    _cb_tds = etree.XPath(".//td")
+    _cb_actual = etree.XPath(f".//div[{_xpath_class('actual_div')}]")
+    _cb_span = etree.XPath(".//span")
+    _cb_consensus = etree.XPath(f".//div[{_xpath_class('consensus_div')}]")
+    _cb_impact = etree.XPath(".//div[contains(@class, 'ec-fx-impact')]")
+    _cb_flex = etree.XPath(".//div[contains(@style, 'flex: 1')]")
+    _cb_previous = etree.XPath(f".//div[{_xpath_class('previous_div')}]")
+
+    _ff_rows = etree.XPath("//tr")
+    _ff_cells = {
+        name: etree.XPath(f".//td[{_xpath_class(name)}]")
+        for name in ("calendar__date", "calendar__time", "calendar__currency", "calendar__event",
+                     "calendar__impact", "calendar__actual", "calendar__forecast", "calendar__previous")
+    }
+    _ff_date_span = etree.XPath(f".//span[{_xpath_class('date')}]")
+    _ff_event_title = etree.XPath(f".//span[{_xpath_class('calendar__event-title')}]")
+    _ff_impact_icon = etree.XPath(".//span[contains(@class, 'icon--ff-impact')]")
+
+    def _root(self, content: str):
+        return etree.fromstring(content, etree.HTMLParser()) if content and content.strip() else None
+
+    def _text(self, element) -> str:
+        """Equivalent of BeautifulSoup's get_text(strip=True)."""
+        return "".join(t.strip() for t in self._texts(element))
+
+    def _first(self, xpath, element):
+        found = xpath(element)
+        return found[0] if found else None
+
+    def parse_cashback_forex(self, content: str) -> List[Dict[str, Any]]:
+        root = self._root(content)
+        if root is None:
+            return []
+        return [event for event in map(self.parse_cashback_forex_row, self._cb_rows(root)) if event]
+
+    def parse_cashback_forex_row(self, row) -> Optional[Dict[str, Any]]:
+        if not row.get("time") or not self._cb_time_string(row):
+            return None
+
+        date_str = _cashback_date(row.get("time"))
+
+        tds = self._cb_tds(row)
+        if len(tds) < 3:
+            return None
+        td1, td2, td3 = tds[0], tds[1], tds[2]
+
+        time_div = self._first(self._cb_time_string, td1)
+        event_time = self._text(time_div) if time_div is not None else None
+        actual_div = self._first(self._cb_actual, td1)
+        actual_text = self._text(actual_div) if actual_div is not None else ""
+
+        country_span = self._first(self._cb_span, td2)
+        country = self._text(country_span) if country_span is not None else None
+        consensus_div = self._first(self._cb_consensus, td2)
+        forecast_text = self._text(consensus_div) if consensus_div is not None else ""
+
+        impact_div = self._first(self._cb_impact, td3)
+        impact = _cashback_impact(impact_div.get("class").split()) if impact_div is not None else None
+
+        flex_div = self._first(self._cb_flex, td3)
+        if flex_div is not None:
+            event_name = " ".join(t.strip() for t in self._texts(flex_div) if t.strip())
+        else:
+            event_name = self._text(td3)
+
+        previous_div = self._first(self._cb_previous, td3)
+        previous_text = self._text(previous_div) if previous_div is not None else ""
+
+        return _event(
+            date_str, event_time, country, event_name, impact,
+            actual_text or None, forecast_text or None, previous_text or None,
+            "CashbackForex",
+        )
+
+    def parse_forex_factory(self, content: str) -> List[Dict[str, Any]]:
+        root = self._root(content)
+        if root is None:
+            return []
+        return _collect_forex_factory(self, self._ff_rows(root))
+
+    def parse_forex_factory_row(self, row, state: ForexFactoryRowState) -> Optional[Dict[str, Any]]:
+        classes = (row.get("class") or "").split()
+
+        if "calendar__row--day-breaker" in classes:
+            date_span = self._first(self._cb_span, row)
+            if date_span is not None:
+                date_text = self._text(date_span)
+                try:
+                    state.current_date = _day_breaker_date(date_text)
+                except Exception as e:
+                    print(f"Error parsing day breaker date: {str(e)}")
+                    print(f"Raw date text: '{date_text}'")
+            return None
+
+        if "calendar__row" not in classes:
+            return None
+
+        cells = {name: self._first(xpath, row) for name, xpath in self._ff_cells.items()}
+
+        date_cell = cells["calendar__date"]
+        if date_cell is not None:
+            date_span = self._first(self._ff_date_span, date_cell)
+            if date_span is not None:
+                try:
+                    month_day = self._first(self._cb_span, date_span)
+                    if month_day is not None:
+                        state.current_date = _date_cell_date(self._text(month_day))
+                except Exception as e:
+                    print(f"Error parsing date cell: {str(e)}")
+
+        time_cell = cells["calendar__time"]
+        event_time = (self._text(time_cell) or None) if time_cell is not None else None
+
+        currency_cell = cells["calendar__currency"]
+        country = self._text(currency_cell) if currency_cell is not None else None
+
+        event_name = None
+        if cells["calendar__event"] is not None:
+            event_title = self._first(self._ff_event_title, cells["calendar__event"])
+            if event_title is not None:
+                event_name = self._text(event_title)
+
+        if not (state.current_date and country and event_name):
+            return None
+
+        impact = None
+        if cells["calendar__impact"] is not None:
+            impact_icon = self._first(self._ff_impact_icon, cells["calendar__impact"])
+            if impact_icon is not None:
+                impact = _forex_factory_impact((impact_icon.get("class") or "").split())
+
+        values = []
+        for cell_class in ("calendar__actual", "calendar__forecast", "calendar__previous"):
+            value = None
+            cell = cells[cell_class]
+            if cell is not None:
+                span = self._first(self._cb_span, cell)
+                if span is not None:
+                    value = self._text(span) or None
+            values.append(value)
+
+        return _event(state.current_date, event_time, country, event_name, impact, *values, "ForexFactory")
+
+
+class SelectolaxBackend:
+    """Backend using selectolax's lexbor engine (optional dependency)."""
+
+    name = "selectolax"
+
+    def __init__(self):
+        if LexborHTMLParser is None:
+            raise ImportError("selectolax is not installed; run `pip install selectolax`")
+
+    def _strings(self, node) -> List[str]:
+        """Text node contents below `node` in document order, comments excluded."""
+        return [n.text_content for n in node.traverse(include_text=True) if n.tag == "-text"]
+
+    def _text(self, node) -> str:
+        return "".join(t.strip() for t in self._strings(node))
+
+    def _classes(self, node) -> List[str]:
+        return (node.attributes.get("class") or "").split()
+
+    def parse_cashback_forex(self, content: str) -> List[Dict[str, Any]]:
+        tree = LexborHTMLParser(content or "")
+        events = []
+
+        for row in tree.css("tr.ec-fx-table-event-row"):
+            if not row.attributes.get("time") or row.css_first("div.timeString") is None:
+                continue
+
+            date_str = _cashback_date(row.attributes.get("time"))
+
+            tds = row.css("td")
+            if len(tds) < 3:
+                continue
+            td1, td2, td3 = tds[0], tds[1], tds[2]
+
+            time_div = td1.css_first("div.timeString")
+            event_time = self._text(time_div) if time_div is not None else None
+            actual_div = td1.css_first("div.actual_div")
+            actual_text = self._text(actual_div) if actual_div is not None else ""
+
+            country_span = td2.css_first("span")
+            country = self._text(country_span) if country_span is not None else None
+            consensus_div = td2.css_first("div.consensus_div")
+            forecast_text = self._text(consensus_div) if consensus_div is not None else ""
+
+            impact_div = td3.css_first('div[class*="ec-fx-impact"]')
+            impact = _cashback_impact(self._classes(impact_div)) if impact_div is not None else None
+
+            flex_div = td3.css_first('div[style*="flex: 1"]')
+            if flex_div is not None:
+                event_name = " ".join(t.strip() for t in self._strings(flex_div) if t.strip())
+            else:
+                event_name = self._text(td3)
+
+            previous_div = td3.css_first("div.previous_div")
+            previous_text = self._text(previous_div) if previous_div is not None else ""
+
+            events.append(_event(
+                date_str, event_time, country, event_name, impact,
+                actual_text or None, forecast_text or None, previous_text or None,
+                "CashbackForex",
+            ))
+
+        return events
+
+    def parse_forex_factory(self, content: str) -> List[Dict[str, Any]]:
+        tree = LexborHTMLParser(content or "")
+        return _collect_forex_factory(self, tree.css("tr"))
+
+    def parse_forex_factory_row(self, row, state: ForexFactoryRowState) -> Optional[Dict[str, Any]]:
+        classes = self._classes(row)
+
+        if "calendar__row--day-breaker" in classes:
+            date_span = row.css_first("span")
+            if date_span is not None:
+                date_text = self._text(date_span)
+                try:
+                    state.current_date = _day_breaker_date(date_text)
+                except Exception as e:
+                    print(f"Error parsing day breaker date: {str(e)}")
+                    print(f"Raw date text: '{date_text}'")
+            return None
+
+        if "calendar__row" not in classes:
+            return None
+
+        date_cell = row.css_first("td.calendar__date")
+        if date_cell is not None:
+            date_span = date_cell.css_first("span.date")
+            if date_span is not None:
+                try:
+                    # css_first would match date_span itself, so skip it when walking the subtree
+                    month_day = next((n for n in islice(date_span.traverse(), 1, None) if n.tag == "span"), None)
+                    if month_day is not None:
+                        state.current_date = _date_cell_date(self._text(month_day))
+                except Exception as e:
+                    print(f"Error parsing date cell: {str(e)}")
+
+        time_cell = row.css_first("td.calendar__time")
+        event_time = (self._text(time_cell) or None) if time_cell is not None else None
+
+        currency_cell = row.css_first("td.calendar__currency")
+        country = self._text(currency_cell) if currency_cell is not None else None
+
+        event_name = None
+        event_cell = row.css_first("td.calendar__event")
+        if event_cell is not None:
+            event_title = event_cell.css_first("span.calendar__event-title")
+            if event_title is not None:
+                event_name = self._text(event_title)
+
+        if not (state.current_date and country and event_name):
+            return None
+
+        impact = None
+        impact_cell = row.css_first("td.calendar__impact")
+        if impact_cell is not None:
+            impact_icon = impact_cell.css_first('span[class*="icon--ff-impact"]')
+            if impact_icon is not None:
+                impact = _forex_factory_impact(self._classes(impact_icon))
+
+        values = []
+        for cell_class in ("calendar__actual", "calendar__forecast", "calendar__previous"):
+            value = None
+            cell = row.css_first(f"td.{cell_class}")
+            if cell is not None:
+                span = cell.css_first("span")
+                if span is not None:
+                    value = self._text(span) or None
+            values.append(value)
+
+        return _event(state.current_date, event_time, country, event_name, impact, *values, "ForexFactory")
+
+
+def _iter_chunks(source, chunk_size: int):
+    """Yield chunks of a string, bytes or file-like object."""
+    if hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        for start in range(0, len(source or ""), chunk_size):
+            yield source[start:start + chunk_size]
+
+
+def _iter_rows(source, chunk_size: int) -> Iterator[Any]:
+    """
+    Yield every <tr> element as soon as its end tag has been parsed.
+
+    Rows are cleared and detached once the caller has consumed them, so only
+    the row being processed is kept in memory regardless of the page size.
+    """
+    parser = etree.HTMLPullParser(events=("end",), tag="tr")
+    for chunk in _iter_chunks(source, chunk_size):
+        parser.feed(chunk)
+        for _, row in parser.read_events():
+            yield row
+            parent = row.getparent()
+            # Rows nested in an outer row are released together with their parent
+            if parent is None or any(ancestor.tag == "tr" for ancestor in row.iterancestors()):
+                continue
+            row.clear()
+            while parent[0] is not row:
+                del parent[0]
+            parent.remove(row)
+    parser.close()
+    for _, row in parser.read_events():
+        yield row
+
+
+def iter_forex_factory_rows(source: Union[str, bytes, Any],
+                            chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Stream ForexFactory events from the calendar HTML one row at a time.
+
+    The current day breaker date is carried between rows as parser state, so
+    multi-week pages are handled without a second pass.
+
+    Args:
+        source: Calendar HTML as a string/bytes, or a file-like object
+        chunk_size: Number of characters fed to the parser at a time
+
+    Yields:
+        Event dictionaries identical to LxmlBackend.parse_forex_factory
+    """
+    backend = get_parser_backend("lxml")
+    state = ForexFactoryRowState()
+    for row in _iter_rows(source, chunk_size):
+        try:
+            event = backend.parse_forex_factory_row(row, state)
+        except Exception as e:
+            print(f"Error processing event row: {str(e)}")
+            continue
+        if event:
+            yield event
+
+
+def iter_cashback_forex_rows(source: Union[str, bytes, Any],
+                             chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Stream CashbackForex events from the calendar HTML one row at a time.
+
+    Args:
+        source: Calendar HTML as a string/bytes, or a file-like object
+        chunk_size: Number of characters fed to the parser at a time
+
+    Yields:
+        Event dictionaries identical to LxmlBackend.parse_cashback_forex
+    """
+    backend = get_parser_backend("lxml")
+    for row in _iter_rows(source, chunk_size):
+        if "ec-fx-table-event-row" in (row.get("class") or "").split():
+            event = backend.parse_cashback_forex_row(row)
+            if event:
+                yield event
+
+
+PARSER_BACKENDS = {
+    BeautifulSoupBackend.name: BeautifulSoupBackend,
+    LxmlBackend.name: LxmlBackend,
+    SelectolaxBackend.name: SelectolaxBackend,
+}
+
+_backends: Dict[str, Any] = {}
+
+
+def get_parser_backend(name: Optional[str] = None):
+    """
+    Return the parser backend called `name` (defaults to PARSER_BACKEND).
+
+    Falls back to the BeautifulSoup backend if the requested one is unknown
+    or its dependency is missing.
+    """
+    name = name or PARSER_BACKEND
+    if name not in _backends:
+        try:
+            _backends[name] = PARSER_BACKENDS[name]()
+        except (KeyError, ImportError) as e:
+            print(f"Parser backend '{name}' unavailable ({str(e)}), using bs4")
+            _backends[name] = BeautifulSoupBackend()
+    return _backends[name]
@@ -0,0 +1,109 @@
+"""
+In-process response cache for read endpoints.
+
+Entries are tagged with the data version they were computed from; bumping
+the version (done by EconomicCalendarDB.save_events whenever a write lands)
+invalidates every older entry. A TTL bounds staleness for writes made by
+other processes, and an LRU bound keeps memory in check.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+EVENTS_CACHE_SIZE = int(os.getenv("EVENTS_CACHE_SIZE", "128"))
+EVENTS_CACHE_TTL = float(os.getenv("EVENTS_CACHE_TTL", "300"))
+
+_MISSING = object()
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with a TTL and data-version invalidation."""
+
+    def __init__(self, max_entries: int = EVENTS_CACHE_SIZE, ttl: float = EVENTS_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, version: int, default: Any = None) -> Any:
+        """Return the cached value for `key` if it is fresh and from `version`."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, entry_version, expires_at = entry
+            if entry_version != version or expires_at < time.monotonic():
+                del self._entries[key]
+                self.invalidations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, version: int, value: Any) -> None:
+        """Store `value` computed from data `version`, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = (value, version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+def _normalize_list(values: Optional[Iterable[str]]) -> Optional[Tuple[str, ...]]:
+    return tuple(sorted(set(values))) if values else None
+
+
+def events_cache_key(start_date: Optional[str] = None,
+                     end_date: Optional[str] = None,
+                     countries: Optional[Iterable[str]] = None,
+                     impact: Optional[Iterable[str]] = None,
+                     sources: Optional[Iterable[str]] = None,
+                     fields: Optional[Iterable[str]] = None,
+                     limit: Optional[int] = None,
+                     cursor: Optional[str] = None,
+                     start_time: Optional[datetime] = None,
+                     end_time: Optional[datetime] = None) -> Tuple:
+    """Normalize /events filters and paging so equivalent queries share a cache entry."""
+    return (
+        start_date or None,
+        end_date or None,
+        _normalize_list(countries),
+        _normalize_list(impact),
+        _normalize_list(sources),
+        _normalize_list(fields),
+        limit or None,
+        cursor or None,
+        start_time.isoformat() if start_time else None,
+        end_time.isoformat() if end_time else None,
+    )
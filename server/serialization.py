@@ -0,0 +1,48 @@
+"""
+Direct JSON serialization of MongoDB documents for API responses.
+
+Documents go straight to bytes in one pass: ObjectId becomes its hex string
+and datetime its ISO 8601 form (the same output as db.JSONEncoder), without
+an intermediate encode/decode round trip. orjson is used when installed;
+otherwise the standard library encoder produces the same JSON.
+"""
+import json
+from datetime import datetime
+from typing import Any
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize a response body (Mongo documents included) to UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse that renders with `dumps`, so handlers can return raw Mongo documents."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(JSONResponse):
+    """JSONResponse for a body that is already serialized (e.g. a cached payload)."""
+
+    def render(self, content: bytes) -> bytes:
+        return content
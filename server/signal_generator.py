@@ -1,115 +1,84 @@
-import requests
-import json
 from datetime import datetime
-import os
 from dotenv import load_dotenv
 import re
-from google import genai
+from signal_parser import SignalParseError, SignalStreamParser, repair_json
+from utils.compactEvents import encode_events_table
 
 # Load environment variables from .env file
 load_dotenv()
 
-api_key=os.getenv("OPENROUTER_API_KEY")
+# Bump whenever the prompt template below changes, so cached responses
+# generated from the old template are no longer reused
+PROMPT_VERSION = 3
 
-def analyze_with_ai(data_to_analyze):
-    """Send data to AI for analysis via OpenRouter API, focusing on trading signals"""
-    
-    # Get API key from environment variable for security
-    api_key = os.environ.get("OPENROUTER_API_KEY")
-    if not api_key:
-        raise ValueError("OpenRouter API key not found. Set the OPENROUTER_API_KEY environment variable.")
-    
-    response = requests.post(
-        url="https://openrouter.ai/api/v1/chat/completions",
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-        },
-        data=json.dumps({
-            "model": "deepseek/deepseek-chat-v3-0324:free",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"""
-                            Analyze the following economic data from today ({datetime.now().strftime('%Y-%m-%d')}) and generate trading signals:
-                            
-                            {json.dumps(data_to_analyze, indent=2)}
-                            
-                            Please provide your analysis in the following JSON format:
-                            {{
-                                "market_summary": "Brief overall market summary based on economic indicators",
-                                "signals": [
-                                    {{
-                                        "pair": "Currency pair or asset",
-                                        "direction": "BUY or SELL",
-                                        "strength": "HIGH, MEDIUM, or LOW",
-                                        "confidence": "Confidence level in percentage",
-                                        "rationale": "Brief explanation of the signal",
-                                        "impact": "Potential market impact",
-                                    }}
-                                ],
-                            }}
-                            """
-                        }
-                    ]
-                }
-            ],
-        })
-    )
-    
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"Error: {response.status_code}")
-        print(f"Response: {response.text}")
-        return None
-    
-
-def analyze_signal_gemeni(data_to_analyze):
-    gen_api = os.getenv("GENAI_API_KEY")
-    if not gen_api:
-        print("Error: GENAI_API_KEY environment variable not found")
-        return None
-        
-    prompt = f"""
-    Analyze the following economic data from today ({datetime.now().strftime('%Y-%m-%d')}) and generate trading signals:
-    {json.dumps(data_to_analyze, indent=2)}
-    Please provide your analysis in the following JSON format:
-
-    {{
+# Response schema shown to the model in every prompt
+SIGNAL_JSON_FORMAT = """
+    {
         "market_summary": "Brief overall market summary based on economic indicators",
         "signals": [
-            {{
+            {
                 "pair": "Currency pair or asset",
                 "direction": "BUY or SELL",
                 "strength": "HIGH, MEDIUM, or LOW",
                 "confidence": "Confidence level in percentage",
                 "rationale": "Brief explanation of the signal",
                 "impact": "Potential market impact",
-            }}
+            }
         ],
-    }}
-    """
-    try:
-        # Initialize the client
-        client = genai.Client(api_key=gen_api)
-        # Call the Gemini API with the prompt
-        response = client.models.generate_content(
-    model="gemini-2.0-flash", contents=prompt,
-        )
+    }
+"""
+
+# Version of the incremental prompt template (see build_signal_prompt)
+INCREMENTAL_PROMPT_VERSION = 3
+# Version of the per-currency focus line added to sharded prompts
+SHARD_PROMPT_VERSION = 1
 
-        # Check if the response is valid
-        return response.text
-    except Exception as e:
-        print(f"Error calling Gemini API: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
-        return None
 
+def build_signal_prompt(data_to_analyze, previous=None, currencies=None):
+    """
+    Build the signal generation prompt.
+    
+    Args:
+        data_to_analyze: Events to analyze (extract_source_data output)
+        previous: Stored signal set ({"market_summary", "signals"}) to update;
+            data_to_analyze then holds only the new or changed events
+        currencies: Currencies of a prompt shard; the summary and signals are
+            then asked to focus on them
+    
+    Returns:
+        Prompt text
+    """
+    today = datetime.now().strftime('%Y-%m-%d')
+    focus = (f"    Focus the market summary and signals on {', '.join(currencies)} and the pairs they trade in.\n"
+             if currencies else "")
+    if previous is None:
+        return f"""
+    Analyze the following economic data from today ({today}) and generate trading signals:
+{encode_events_table(data_to_analyze)}
+{focus}    Please provide your analysis in the following JSON format:
+{SIGNAL_JSON_FORMAT}    """
+    
+    # One line per current signal keeps the context short
+    current_signals = "\n".join(
+        f"    - {signal.get('pair')}: {signal.get('direction')} ({signal.get('strength')})"
+        for signal in previous.get("signals", [])
+    ) or "    (none)"
+    return f"""
+    The following economic releases from today ({today}) are new or have changed since the last analysis:
+{encode_events_table(data_to_analyze)}
+    
+    Previous market summary:
+    {previous.get("market_summary", "")}
     
+    Current signals:
+{current_signals}
+    
+    Update the analysis for these changes. Give the updated overall market summary, and signals
+    only for the pairs these releases affect (a new signal replaces the current one for its pair).
+{focus}    Please provide your analysis in the following JSON format:
+{SIGNAL_JSON_FORMAT}    """
+
+
 def clean_json_response(response_text):
     """Clean the AI response by removing any markdown formatting and extracting just the JSON"""
     # Remove markdown code blocks if present
@@ -123,3 +92,42 @@ def clean_json_response(response_text):
         clean_text = response_text.strip()
     
     return clean_text
+
+
+class SignalResponseError(ValueError):
+    """The AI response is not a valid signals document."""
+
+    def __init__(self, message, raw_content, cleaned_content):
+        super().__init__(message)
+        self.raw_content = raw_content
+        self.cleaned_content = cleaned_content
+
+
+def parse_signal_response(response_text):
+    """
+    Parse an AI response into the signals document.
+    
+    Code fences, trailing commas and a truncated end are repaired, and
+    signals that do not match the signal schema are dropped (see
+    signal_parser).
+    
+    Args:
+        response_text: Raw response text
+    
+    Returns:
+        Dictionary with "market_summary", a "signals" list and "truncated",
+        True if the response was cut off and only its complete signals were kept
+    
+    Raises:
+        SignalResponseError: If the response has no signals list or is cut
+            off before any complete signal
+    """
+    parser = SignalStreamParser()
+    parser.feed(response_text)
+    try:
+        analysis = parser.close()
+    except SignalParseError as e:
+        raise SignalResponseError(str(e), response_text, repair_json(response_text)) from e
+    if parser.dropped:
+        print(f"Dropped {parser.dropped} signals that do not match the signal schema")
+    return analysis
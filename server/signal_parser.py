@@ -0,0 +1,331 @@
+"""
+Tolerant, incremental extraction of the signals document from LLM output.
+
+Model output is rarely clean JSON: it comes wrapped in ``` fences, with
+trailing commas (the prompt's own format template has them) or cut off
+mid-array when the response hits a length limit. SignalStreamParser consumes
+the text as it arrives, in chunks of any size, and hands out every signal
+object of the "signals" array as soon as its closing brace is seen. Only a
+"{" followed by a quote or "}" starts the document, so braces in prose
+before it ("Here is {my} answer") are skipped.
+close() then parses the whole document, repairing those defects, and falls
+back to the signals already collected when even the repaired text does not
+parse. A document without a "signals" list is an error, and a document that
+was cut off is flagged as truncated so callers can avoid storing it. Every
+signal is validated against SIGNAL_SCHEMA; invalid ones are dropped.
+"""
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+# Required fields, and the accepted values of enumerated ones
+SIGNAL_SCHEMA = {
+    "pair": None,
+    "direction": {"BUY", "SELL"},
+}
+OPTIONAL_FIELDS = {
+    "strength": {"HIGH", "MEDIUM", "LOW"},
+    "confidence": None,
+    "rationale": None,
+    "impact": None,
+}
+DIRECTION_ALIASES = {"LONG": "BUY", "BULLISH": "BUY", "SHORT": "SELL", "BEARISH": "SELL"}
+
+_TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+_SIGNALS_KEY_RE = re.compile(r'"signals"\s*:\s*$')
+_SUMMARY_KEY = '"market_summary"'
+_SUMMARY_RE = re.compile(r'"market_summary"\s*:\s*("(?:[^"\\]|\\.)*")')
+# A "{" and the first character after it; only '"' or "}" start a JSON object
+_OBJECT_START_RE = re.compile(r'\{\s*(\S)?')
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class SignalParseError(ValueError):
+    """No signals document could be recovered from the text."""
+
+
+def validate_signal(signal: Any) -> Optional[Dict[str, str]]:
+    """
+    Check a signal against SIGNAL_SCHEMA and normalize its values.
+
+    Args:
+        signal: Parsed signal object
+
+    Returns:
+        The signal with string values, upper-case direction and strength and
+        a "%" confidence, or None if it is not a dict or lacks a valid pair
+        or direction
+    """
+    if not isinstance(signal, dict):
+        return None
+    pair = str(signal.get("pair") or "").strip()
+    direction = str(signal.get("direction") or "").strip().upper()
+    direction = DIRECTION_ALIASES.get(direction, direction)
+    if not pair or direction not in SIGNAL_SCHEMA["direction"]:
+        return None
+
+    result = {"pair": pair, "direction": direction}
+    for field, allowed in OPTIONAL_FIELDS.items():
+        value = signal.get(field)
+        if value is None:
+            continue
+        if field == "confidence" and isinstance(value, (int, float)):
+            value = f"{value:g}%"
+        value = str(value).strip()
+        if allowed is not None:
+            value = value.upper()
+            if value not in allowed:
+                continue
+        result[field] = value
+    return result
+
+
+def _object_start(text: str, pos: int = 0) -> Optional[int]:
+    """
+    Find the first "{" at or after `pos` that opens a JSON object.
+
+    Braces in prose ("Here is {my} answer") are skipped. A "{" with nothing
+    after it yet also counts, so truncated text still has a start.
+
+    Returns:
+        Index of the "{", or None if there is none
+    """
+    while True:
+        start = text.find("{", pos)
+        if start == -1:
+            return None
+        match = _OBJECT_START_RE.match(text, start)
+        if match.group(1) is None or match.group(1) in '"}':
+            return start
+        pos = start + 1
+
+
+def strip_code_fences(text: str) -> str:
+    """Return the text from the first object's "{" on, dropping a ``` fence and anything after the closing fence."""
+    start = _object_start(text)
+    if start is None:
+        return ""
+    text = text[start:]
+    fence = text.find("```")
+    return text[:fence] if fence != -1 else text
+
+
+def remove_trailing_commas(text: str) -> str:
+    """Remove commas directly before a closing bracket, outside strings."""
+    parts = re.split(r'("(?:[^"\\]|\\.)*")', text)
+    # Odd indexes are the string literals
+    return "".join(part if i % 2 else _TRAILING_COMMA_RE.sub(r"\1", part) for i, part in enumerate(parts))
+
+
+def close_truncated(text: str) -> str:
+    """
+    Cut truncated JSON back to its last complete element and close the open brackets.
+
+    Args:
+        text: JSON text starting with "{", possibly cut off anywhere
+
+    Returns:
+        Text with balanced brackets, up to the end of the first complete
+        top-level value
+    """
+    stack: List[str] = []
+    in_string = escaped = False
+    # Where the text can be cut (everything before it is complete), and the brackets open there
+    cut, cut_stack = 0, []
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(char)
+            cut, cut_stack = i + 1, list(stack)
+        elif char in "}]" and stack:
+            stack.pop()
+            if not stack:
+                return text[:i + 1]
+            cut, cut_stack = i + 1, list(stack)
+        elif char == ",":
+            cut, cut_stack = i, list(stack)
+    return text[:cut] + "".join(_CLOSERS[bracket] for bracket in reversed(cut_stack))
+
+
+def repair_json(text: str) -> str:
+    """Apply strip_code_fences, close_truncated and remove_trailing_commas."""
+    return remove_trailing_commas(close_truncated(strip_code_fences(text)))
+
+
+class SignalStreamParser:
+    """
+    Incremental parser for a streamed signals document.
+
+    Usage:
+        parser = SignalStreamParser()
+        for chunk in chunks:
+            for signal in parser.feed(chunk):
+                ...  # each valid signal as soon as it is complete
+        analysis = parser.close()
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.market_summary: Optional[str] = None
+        self.signals: List[Dict[str, str]] = []
+        self.dropped = 0
+        # Set by close(): the document was cut off before its closing brace
+        self.truncated = False
+        self._complete = False
+        self._seen_signals = False
+        self._pos = 0
+        # Where "market_summary" is searched for next
+        self._summary_pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        # Depth of the "signals" array, and start of the signal object being read
+        self._signals_depth: Optional[int] = None
+        self._object_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Dict[str, str]]:
+        """
+        Consume the next piece of model output.
+
+        Args:
+            chunk: Text following everything fed so far
+
+        Returns:
+            Valid signals completed by this chunk, in order
+        """
+        self.text += chunk
+        completed = []
+        text = self.text
+        start, self._pos = self._pos, len(text)
+        for i in range(start, len(text)):
+            char = text[i]
+            # Prose and fences around the document are skipped, braces in prose included
+            if not self._stack:
+                if char != "{":
+                    continue
+                match = _OBJECT_START_RE.match(text, i)
+                if match.group(1) is None:
+                    # Whether this "{" opens the document depends on text not received yet
+                    self._pos = i
+                    break
+                if match.group(1) not in '"}':
+                    continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char == "[":
+                if self._signals_depth is None and _SIGNALS_KEY_RE.search(text, max(0, i - 64), i):
+                    self._signals_depth = len(self._stack) + 1
+                    self._seen_signals = True
+                self._stack.append(char)
+            elif char == "{":
+                self._stack.append(char)
+                if self._signals_depth is not None and len(self._stack) == self._signals_depth + 1:
+                    self._object_start = i
+            elif char in "}]" and self._stack:
+                depth = len(self._stack)
+                self._stack.pop()
+                if char == "}" and self._object_start is not None and depth == (self._signals_depth or 0) + 1:
+                    signal = self._parse_signal(text[self._object_start:i + 1])
+                    self._object_start = None
+                    if signal is not None:
+                        completed.append(signal)
+                elif char == "]" and depth == self._signals_depth:
+                    self._signals_depth = None
+                if not self._stack:
+                    self._complete = True
+
+        if self.market_summary is None:
+            # Only the new text and a key cut at the previous chunk boundary are searched
+            key = text.find(_SUMMARY_KEY, self._summary_pos)
+            if key == -1:
+                self._summary_pos = max(self._summary_pos, len(text) - len(_SUMMARY_KEY) + 1)
+            else:
+                # The value may still be incomplete; retry from the key with the next chunk
+                self._summary_pos = key
+                match = _SUMMARY_RE.match(text, key)
+                if match:
+                    self.market_summary = json.loads(match.group(1))
+        self.signals.extend(completed)
+        return completed
+
+    def _parse_signal(self, text: str) -> Optional[Dict[str, str]]:
+        try:
+            signal = validate_signal(json.loads(remove_trailing_commas(text)))
+        except json.JSONDecodeError:
+            signal = None
+        if signal is None:
+            self.dropped += 1
+        return signal
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Finish the stream and return the whole signals document.
+
+        Returns:
+            Dictionary with "market_summary", the validated "signals" and
+            "truncated", True if the document was cut off and had to be
+            closed (its signals are then only those that were complete)
+
+        Raises:
+            SignalParseError: If the text holds no "signals" list, or the
+                document is cut off before any complete signal
+        """
+        self.truncated = not self._complete
+        try:
+            document = json.loads(repair_json(self.text))
+        except json.JSONDecodeError:
+            document = None
+
+        if isinstance(document, dict) and isinstance(document.get("signals"), list):
+            signals = [validate_signal(signal) for signal in document["signals"]]
+            self.dropped = signals.count(None)
+            if self.truncated and not any(signals):
+                raise SignalParseError("The response was cut off before any complete signal")
+            return {
+                "market_summary": str(document.get("market_summary") or self.market_summary or ""),
+                "signals": [signal for signal in signals if signal is not None],
+                "truncated": self.truncated,
+            }
+        if isinstance(document, dict) and not self.truncated:
+            raise SignalParseError("Invalid JSON structure: 'signals' key is missing or not a list")
+        if self._seen_signals and self.signals:
+            # Unparseable even after repair: keep what was read completely
+            self.truncated = True
+            return {"market_summary": self.market_summary or "", "signals": list(self.signals), "truncated": True}
+        raise SignalParseError("No signals document found in the response")
+
+
+def parse_signals(text: str) -> Dict[str, Any]:
+    """
+    Parse a complete response into the signals document.
+
+    Args:
+        text: Model output
+
+    Returns:
+        Dictionary with "market_summary", the validated "signals" and the
+        "truncated" flag (see SignalStreamParser.close)
+
+    Raises:
+        SignalParseError: If no signals document can be recovered
+    """
+    parser = SignalStreamParser()
+    parser.feed(text)
+    return parser.close()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Make the server modules importable when running pytest from the repository root
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
@@ -0,0 +1,156 @@
+"""DriverPool with a stub driver factory instead of Chrome."""
+import threading
+import time
+from contextlib import ExitStack
+
+import pytest
+
+from driver_pool import DriverPool, DriverPoolClosed
+
+
+class StubDriver:
+    def __init__(self, number):
+        self.number = number
+        self.healthy = True
+        self.quit_calls = 0
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("session deleted")
+        return 1 if script == "return 1" else None
+
+    def delete_all_cookies(self):
+        pass
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class StubFactory:
+    def __init__(self):
+        self.drivers = []
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            driver = StubDriver(len(self.drivers))
+            self.drivers.append(driver)
+            return driver
+
+
+def test_lease_reuses_a_warm_driver():
+    factory = StubFactory()
+    pool = DriverPool(factory, size=2, max_uses=10)
+
+    with pool.lease() as first:
+        pass
+    with pool.lease() as second:
+        pass
+
+    assert first is second
+    assert len(factory.drivers) == 1
+    assert pool.get_stats()["reused"] == 1
+
+
+def test_leases_are_bounded_by_pool_size():
+    factory = StubFactory()
+    pool = DriverPool(factory, size=2, lease_timeout=0.1)
+
+    with ExitStack() as stack:
+        drivers = [stack.enter_context(pool.lease()) for _ in range(2)]
+        with pytest.raises(TimeoutError):
+            with pool.lease():
+                pass
+
+    assert len({driver.number for driver in drivers}) == 2
+    assert len(factory.drivers) == 2
+
+
+def test_concurrent_leases_never_exceed_pool_size():
+    factory = StubFactory()
+    pool = DriverPool(factory, size=2, lease_timeout=5)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def scrape():
+        with pool.lease():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=scrape) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak[0] == 2
+    assert len(factory.drivers) <= 2
+
+
+def test_driver_is_recycled_after_max_uses():
+    factory = StubFactory()
+    pool = DriverPool(factory, size=1, max_uses=2)
+
+    for _ in range(3):
+        with pool.lease():
+            pass
+
+    first, second = factory.drivers
+    assert first.quit_calls == 1
+    assert second.quit_calls == 0
+    assert pool.get_stats()["recycled"] == 1
+
+
+def test_unhealthy_idle_driver_is_replaced():
+    factory = StubFactory()
+    pool = DriverPool(factory, size=1)
+
+    with pool.lease() as driver:
+        pass
+    driver.healthy = False
+    with pool.lease() as replacement:
+        pass
+
+    assert replacement is not driver
+    assert driver.quit_calls == 1
+    assert pool.get_stats()["unhealthy"] == 1
+
+
+def test_crashed_lease_recycles_the_driver():
+    factory = StubFactory()
+    pool = DriverPool(factory, size=1)
+
+    with pytest.raises(RuntimeError):
+        with pool.lease() as driver:
+            raise RuntimeError("chrome not reachable")
+    with pool.lease() as replacement:
+        pass
+
+    assert replacement is not driver
+    assert driver.quit_calls == 1
+    assert pool.get_stats()["recycled"] == 1
+
+
+def test_shutdown_quits_idle_and_leased_drivers():
+    factory = StubFactory()
+    pool = DriverPool(factory, size=2)
+
+    with pool.lease() as leased:
+        with pool.lease() as idle:
+            pass
+        pool.shutdown()
+        assert idle.quit_calls == 1
+        assert leased.quit_calls == 0
+
+    assert leased.quit_calls == 1
+    assert pool.get_stats()["idle"] == 0
+    with pytest.raises(DriverPoolClosed):
+        with pool.lease():
+            pass
@@ -0,0 +1,110 @@
+"""
+llm_client against the local fake Gemini/OpenRouter server.
+
+Each test starts benchmarks/fake_llm_server on a free port, points providers
+at it and scripts the failures with its `statuses` and `stream_stall` hooks.
+"""
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestServer
+
+import llm_client
+from benchmarks.fake_llm_server import SIGNALS, make_app
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_RETRY_BACKOFF", 0.01)
+    monkeypatch.setattr(llm_client, "LLM_MAX_RETRIES", 2)
+    monkeypatch.setattr(llm_client, "LLM_TIMEOUT", 5.0)
+
+
+def run(app, test):
+    """Serve `app` and run `test(gemini, openrouter)` against it on a fresh event loop."""
+    async def main():
+        server = TestServer(app)
+        await server.start_server()
+        base_url = str(server.make_url("")).rstrip("/")
+        gemini = llm_client.GeminiProvider(base_url=base_url, api_key="fake")
+        openrouter = llm_client.OpenRouterProvider(base_url=f"{base_url}/api/v1", api_key="fake")
+        try:
+            return await test(gemini, openrouter)
+        finally:
+            await llm_client.close_llm_client()
+            gemini.reset()
+            await server.close()
+    return asyncio.run(main())
+
+
+def test_generate_retries_rate_limit():
+    app = make_app(openrouter_latency=0.01, statuses={"openrouter": [429]})
+
+    result = run(app, lambda gemini, openrouter: llm_client.generate("prompt", [openrouter]))
+
+    assert result["provider"] == "openrouter"
+    assert SIGNALS["market_summary"] in result["text"]
+    assert app["stats"]["openrouter"] == 2
+
+
+def test_generate_gives_up_after_retries():
+    app = make_app(openrouter_latency=0.01, statuses={"openrouter": [500] * 3})
+
+    with pytest.raises(llm_client.LLMUnavailable) as excinfo:
+        run(app, lambda gemini, openrouter: llm_client.generate("prompt", [openrouter]))
+
+    assert "HTTP 500" in excinfo.value.errors["openrouter"]
+    assert app["stats"]["openrouter"] == 3
+
+
+def test_generate_fails_over_after_retries():
+    app = make_app(gemini_latency=0.01, openrouter_latency=0.01, statuses={"openrouter": [500] * 3})
+
+    result = run(app, lambda gemini, openrouter: llm_client.generate("prompt", [openrouter, gemini]))
+
+    assert result["provider"] == "gemini"
+    assert app["stats"] == {"openrouter": 3, "gemini": 1}
+
+
+def test_generate_hedge_beats_slow_primary():
+    app = make_app(gemini_latency=3.0, openrouter_latency=0.05)
+
+    result = run(app, lambda gemini, openrouter: llm_client.generate("prompt", [gemini, openrouter],
+                                                                     hedge_delay=0.1))
+
+    assert result["provider"] == "openrouter"
+    assert result["elapsed_ms"] < 1000
+    assert app["stats"] == {"gemini": 1, "openrouter": 1}
+
+
+async def collect(chunks):
+    received = []
+    try:
+        async for chunk in chunks:
+            received.append(chunk)
+    except llm_client.LLMError as e:
+        return received, e
+    return received, None
+
+
+def test_stream_fails_over_before_first_chunk():
+    app = make_app(gemini_latency=0.05, openrouter_latency=0.01, statuses={"openrouter": [503] * 3})
+
+    received, error = run(app, lambda gemini, openrouter: collect(
+        llm_client.stream_generate("prompt", [openrouter, gemini])))
+
+    assert error is None
+    assert {chunk["provider"] for chunk in received} == {"gemini"}
+    assert SIGNALS["market_summary"] in "".join(chunk["text"] for chunk in received)
+
+
+def test_stream_stall_after_first_chunk_does_not_fail_over(monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_TIMEOUT", 0.3)
+    app = make_app(gemini_latency=0.01, openrouter_latency=0.01, stream_stall=2.0)
+
+    received, error = run(app, lambda gemini, openrouter: collect(
+        llm_client.stream_generate("prompt", [openrouter, gemini])))
+
+    assert [chunk["provider"] for chunk in received] == ["openrouter"]
+    assert isinstance(error, llm_client.LLMStreamStalled)
+    assert app["stats"] == {"openrouter": 1, "gemini": 0}
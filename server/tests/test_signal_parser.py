@@ -0,0 +1,76 @@
+"""Extraction of the signals document from model output."""
+import json
+
+import pytest
+
+from signal_parser import SignalParseError, SignalStreamParser, parse_signals, strip_code_fences
+
+DOCUMENT = {
+    "market_summary": "USD strength on hot CPI",
+    "signals": [
+        {"pair": "EURUSD", "direction": "SELL", "strength": "HIGH", "confidence": "70%"},
+        {"pair": "USDJPY", "direction": "long", "strength": "medium", "confidence": 55},
+    ],
+}
+
+
+def stream(text, size):
+    parser = SignalStreamParser()
+    streamed = []
+    for i in range(0, len(text), size):
+        streamed.extend(parser.feed(text[i:i + size]))
+    return parser, streamed, parser.close()
+
+
+def test_complete_document_with_fences_and_trailing_commas():
+    text = "```json\n" + json.dumps(DOCUMENT, indent=2).replace("}\n  ]", "},\n  ]") + "\n```"
+
+    analysis = parse_signals(text)
+
+    assert analysis["truncated"] is False
+    assert analysis["market_summary"] == DOCUMENT["market_summary"]
+    assert [signal["direction"] for signal in analysis["signals"]] == ["SELL", "BUY"]
+    assert analysis["signals"][1]["confidence"] == "55%"
+
+
+def test_braces_in_prose_before_the_document():
+    text = "Here is {my} answer: " + json.dumps(DOCUMENT) + " Hope {this} helps."
+
+    assert strip_code_fences(text).startswith('{"market_summary"')
+    analysis = parse_signals(text)
+    assert analysis["truncated"] is False
+    assert analysis["market_summary"] == DOCUMENT["market_summary"]
+    assert len(analysis["signals"]) == 2
+
+
+@pytest.mark.parametrize("size", [1, 7, 64])
+def test_streamed_chunks_match_the_whole_text(size):
+    text = "Here is {my} answer: " + json.dumps(DOCUMENT)
+
+    parser, streamed, analysis = stream(text, size)
+
+    assert parser.market_summary == DOCUMENT["market_summary"]
+    assert streamed == analysis["signals"]
+    assert analysis == parse_signals(text)
+    assert analysis["truncated"] is False
+
+
+def test_truncated_document_keeps_complete_signals():
+    text = json.dumps(DOCUMENT)
+    text = text[:text.index("USDJPY") + 10]
+
+    analysis = parse_signals(text)
+
+    assert analysis["truncated"] is True
+    assert [signal["pair"] for signal in analysis["signals"]] == ["EURUSD"]
+    assert analysis["market_summary"] == DOCUMENT["market_summary"]
+
+
+def test_document_without_signals_is_rejected():
+    with pytest.raises(SignalParseError):
+        parse_signals('{"market_summary": "No signals today"}')
+
+
+def test_truncated_before_any_signal_is_rejected():
+    with pytest.raises(SignalParseError):
+        parse_signals('{"market_summary": "USD strength", "signals": [{"pair": "EUR')
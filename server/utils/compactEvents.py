@@ -0,0 +1,115 @@
+import re
+
+from event_time import parse_clock, to_utc
+
+# Columns of the prompt table, in order
+TABLE_COLUMNS = ("date", "time", "country", "event", "impact", "actual", "forecast", "previous", "source")
+# Values are compared and merged on these fields when the same release is
+# reported by several sources
+VALUE_FIELDS = ("impact", "actual", "forecast", "previous")
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def _event_name(event):
+    return re.sub(r"[^a-z0-9%]+", " ", _text(event.get("event")).lower()).strip()
+
+
+def utc_date_time(event):
+    """
+    Return the event's UTC timestamp with its date and time columns
+
+    Both columns come from the same UTC timestamp, so a late release in a
+    source west of UTC moves to the next day. Events without a clock time
+    ("All Day", "Tentative") keep the date and time as reported.
+
+    Returns:
+        tuple: (timestamp or None, "YYYY-MM-DD", "HH:MM" or the reported time)
+    """
+    date, time = _text(event.get("date")), _text(event.get("time"))
+    timestamp = to_utc(date, time, event.get("source")) if parse_clock(time) else None
+    if timestamp is None:
+        return None, date, time
+    return timestamp, timestamp.strftime("%Y-%m-%d"), timestamp.strftime("%H:%M")
+
+
+def dedupe_events(events):
+    """
+    Merge the same release reported by several sources into one event
+
+    Two events are the same release when they have the same currency, event
+    name (ignoring case and punctuation) and UTC timestamp, so the sources'
+    own timezones, calendar dates and clock formats do not matter. The first event wins; empty
+    values are filled in from the duplicates, and the sources are joined
+    with "+".
+
+    Args:
+        events (list): Events (extract_source_data output)
+
+    Returns:
+        list: Deduplicated events in first-seen order, with "date" and "time" in UTC
+    """
+    merged = {}
+    for original in events:
+        event = {field: _text(original.get(field)) for field in TABLE_COLUMNS}
+        timestamp, event["date"], event["time"] = utc_date_time(original)
+        # The instant identifies the release whatever date each source shows it on
+        when = timestamp if timestamp is not None else (event["date"], event["time"])
+        key = (when, event["country"].upper(), _event_name(event))
+        if key not in merged:
+            merged[key] = event
+            continue
+        kept = merged[key]
+        for field in VALUE_FIELDS:
+            kept[field] = kept[field] or event[field]
+        if event["source"] and event["source"] not in kept["source"].split("+"):
+            kept["source"] = f"{kept['source']}+{event['source']}" if kept["source"] else event["source"]
+    return list(merged.values())
+
+
+def encode_events_table(events):
+    """
+    Encode events as a compact pipe-separated table for prompts
+
+    Events are deduplicated across sources first. A column with the same
+    value in every row is written once as a header line instead, and a
+    column that is empty in every row is left out. A header line says which
+    dates and times are UTC: rows without a clock time ("All Day",
+    "Tentative") keep the date the source reported.
+
+    Args:
+        events (list): Events (extract_source_data output)
+
+    Returns:
+        str: Header lines followed by the table
+    """
+    rows = dedupe_events(events)
+    if not rows:
+        return "(no events)"
+    # Rows converted to UTC have an HH:MM clock time (see utc_date_time)
+    timed = [parse_clock(row["time"]) is not None for row in rows]
+
+    lines = []
+    columns = []
+    for column in TABLE_COLUMNS:
+        values = {row[column] for row in rows}
+        if values == {""}:
+            continue
+        if len(values) == 1 and len(rows) > 1:
+            lines.append(f"{column}: {values.pop()} (all events)")
+        else:
+            columns.append(column)
+    if "time" in columns or any(line.startswith("time:") for line in lines):
+        if all(timed):
+            lines.append("dates and clock times are UTC")
+        elif any(timed):
+            lines.append("dates and clock times are UTC; rows without a clock time use the source's local date")
+        else:
+            lines.append("dates are the source's local dates")
+
+    lines.append("|".join(columns))
+    for row in rows:
+        lines.append("|".join(row[column].replace("|", "/").replace("\n", " ") for column in columns))
+    return "\n".join(lines)
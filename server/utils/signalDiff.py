@@ -0,0 +1,74 @@
+import hashlib
+import json
+
+# Fields that change when a release comes in (or is revised) during the day
+CHANGING_FIELDS = ("actual", "forecast", "previous", "impact")
+
+
+def event_key(event):
+    """Identify an event across intraday refreshes."""
+    return "|".join(str(event.get(field) or "") for field in ("source", "date", "time", "country", "event"))
+
+
+def event_hash(event):
+    """Hash the fields of an event that change between refreshes."""
+    values = [(event.get(field) or "").strip() if isinstance(event.get(field), str) else event.get(field)
+              for field in CHANGING_FIELDS]
+    return hashlib.sha1(json.dumps(values, default=str).encode("utf-8")).hexdigest()
+
+
+def snapshot_events(events):
+    """
+    Build the snapshot stored with a signal set
+
+    Args:
+        events (list): Events the signals were generated from (extract_source_data output)
+
+    Returns:
+        list: {"key", "hash"} entries, one per event
+    """
+    return [{"key": event_key(event), "hash": event_hash(event)} for event in events]
+
+
+def diff_events(events, snapshot):
+    """
+    Find the events that are new, changed or removed since a snapshot was taken
+
+    Args:
+        events (list): Current events
+        snapshot (list): Snapshot stored with the previous signal set
+
+    Returns:
+        tuple: (events whose key is not in the snapshot or whose values
+        changed, snapshot keys that no current event has)
+    """
+    previous = {entry["key"]: entry["hash"] for entry in snapshot or []}
+    current = {event_key(event) for event in events}
+    changed = [event for event in events if previous.get(event_key(event)) != event_hash(event)]
+    removed = [key for key in previous if key not in current]
+    return changed, removed
+
+
+def merge_signals(previous_signals, new_signals):
+    """
+    Merge regenerated signals into the previous set, one signal per pair
+
+    A new signal replaces the previous one for the same pair; pairs the model
+    did not mention keep their previous signal.
+
+    Args:
+        previous_signals (list): Signals of the stored signal set
+        new_signals (list): Signals returned for the changed events
+
+    Returns:
+        list: Merged signals, previous order first, new pairs appended
+    """
+    def pair_of(signal):
+        return str(signal.get("pair") or "").replace("/", "").replace(" ", "").upper()
+
+    merged = {}
+    for signal in previous_signals or []:
+        merged[pair_of(signal)] = signal
+    for signal in new_signals or []:
+        merged[pair_of(signal)] = signal
+    return list(merged.values())
@@ -0,0 +1,75 @@
+import re
+
+# Events without a currency are grouped under this key
+NO_CURRENCY = "ALL"
+
+
+def group_by_currency(events):
+    """Group events by their currency (the "country" field), keeping event order."""
+    groups = {}
+    for event in events:
+        currency = str(event.get("country") or "").strip().upper() or NO_CURRENCY
+        groups.setdefault(currency, []).append(event)
+    return groups
+
+
+def shard_events(events, max_events):
+    """
+    Split events into prompt shards of whole currencies
+
+    Currencies are packed largest first into the first shard with room for
+    them, so small currencies share a prompt while a busy currency gets its
+    own. A currency is never split across shards, even when it alone has
+    more than max_events events.
+
+    Args:
+        events (list): Events to analyze (extract_source_data output)
+        max_events (int): Target maximum number of events per shard
+
+    Returns:
+        list: {"currencies", "events"} dicts, largest shard first
+    """
+    groups = sorted(group_by_currency(events).items(), key=lambda item: len(item[1]), reverse=True)
+    shards = []
+    for currency, group in groups:
+        for shard in shards:
+            if len(shard["events"]) + len(group) <= max_events:
+                shard["currencies"].append(currency)
+                shard["events"].extend(group)
+                break
+        else:
+            shards.append({"currencies": [currency], "events": list(group)})
+    return shards
+
+
+def _confidence(signal):
+    match = re.search(r"\d+(?:\.\d+)?", str(signal.get("confidence") or ""))
+    return float(match.group()) if match else 0.0
+
+
+def combine_shard_signals(shard_results):
+    """
+    Merge the analyses of several shards into one signal set
+
+    A pair can come back from two shards (EURUSD from the EUR and the USD
+    shard); the signal with the higher confidence is kept. The market summary
+    is the shard summaries, each prefixed with its currencies.
+
+    Args:
+        shard_results (list): (currencies, analysis) tuples of the shards that
+            succeeded, analysis being the parsed {"market_summary", "signals"}
+
+    Returns:
+        dict: {"market_summary", "signals"}
+    """
+    signals = {}
+    summaries = []
+    for currencies, analysis in shard_results:
+        summary = str(analysis.get("market_summary") or "").strip()
+        if summary:
+            summaries.append(summary if len(shard_results) == 1 else f"{', '.join(currencies)}: {summary}")
+        for signal in analysis.get("signals") or []:
+            pair = str(signal.get("pair") or "").replace("/", "").replace(" ", "").upper()
+            if pair not in signals or _confidence(signal) > _confidence(signals[pair]):
+                signals[pair] = signal
+    return {"market_summary": "\n\n".join(summaries), "signals": list(signals.values())}
@@ -1,9 +1,14 @@
-def transform_economic_events(events_data):
+# Fields read by transform_economic_events; pass them to get_events(fields=...)
+# so Mongo only sends what the response needs
+EVENT_FIELDS = ("date", "time", "country", "event", "impact", "actual", "forecast", "previous", "source")
+
+def transform_economic_events(events_data, fields=EVENT_FIELDS):
     """
     Transform raw MongoDB events data into a clean response format
     
     Args:
         events_data (list): Raw events data from MongoDB
+        fields (tuple): Fields to include, a subset of EVENT_FIELDS
         
     Returns:
         dict: Formatted response with transformed events data
@@ -12,17 +17,7 @@ def transform_economic_events(events_data):
     
     for event in events_data:
         # Extract only the required fields
-        transformed_event = {
-            "date": event.get("date"),
-            "time": event.get("time"),
-            "country": event.get("country"),
-            "event": event.get("event"),
-            "impact": event.get("impact"),
-            "actual": event.get("actual"),
-            "forecast": event.get("forecast"),
-            "previous": event.get("previous"),
-            "source": event.get("source")
-        }
+        transformed_event = {field: event.get(field) for field in fields}
         transformed_data.append(transformed_event)
     
     return {
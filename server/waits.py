@@ -0,0 +1,151 @@
+import os
+import random
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Multiplier applied to every human-like pause; set to 0 to disable them (tests)
+SCRAPE_JITTER_SCALE = float(os.getenv("SCRAPE_JITTER_SCALE", "1"))
+
+# Per-source latency budget (seconds to wait for the calendar to be ready)
+# and jitter range (seconds) used for human-like pauses
+SCRAPE_WAIT_CONFIG = {
+    "cashbackforex": {
+        "budget": float(os.getenv("CASHBACKFOREX_WAIT_BUDGET", "15")),
+        "jitter": (0.2, 0.8),
+    },
+    "forexfactory": {
+        "budget": float(os.getenv("FOREXFACTORY_WAIT_BUDGET", "30")),
+        "jitter": (0.5, 1.5),
+    },
+}
+
+# How often the page is polled and for how many consecutive polls the row
+# count must stay the same before the table is considered fully rendered
+WAIT_POLL_INTERVAL = float(os.getenv("SCRAPE_WAIT_POLL_INTERVAL", "0.25"))
+WAIT_STABLE_POLLS = int(os.getenv("SCRAPE_WAIT_STABLE_POLLS", "2"))
+
+
+class PhaseTimer:
+    """Record the wall time of the named phases of a scrape."""
+
+    def __init__(self, timings: Optional[Dict[str, float]] = None):
+        self.timings = timings if timings is not None else {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round(time.perf_counter() - start, 3)
+
+    def mark(self, name: str) -> None:
+        """Record the time elapsed since the timer was created under `name`."""
+        self.timings[name] = round(time.perf_counter() - self._started, 3)
+
+    def finish(self) -> Dict[str, float]:
+        """Store the total elapsed time and return all timings."""
+        self.timings["total"] = round(time.perf_counter() - self._started, 3)
+        return self.timings
+
+
+def human_pause(source: str) -> float:
+    """
+    Sleep for a random duration within the source's jitter range.
+
+    Returns:
+        The number of seconds slept
+    """
+    low, high = SCRAPE_WAIT_CONFIG[source]["jitter"]
+    delay = random.uniform(low, high) * SCRAPE_JITTER_SCALE
+    if delay > 0:
+        time.sleep(delay)
+    return delay
+
+
+class _RowsStable:
+    """
+    WebDriverWait condition: the row count stopped changing.
+
+    A count of 0 only counts while the table itself is on the page (an
+    empty calendar); the condition then returns True and sets `empty`,
+    since WebDriverWait does not accept 0 as a result.
+    """
+
+    def __init__(self, row_selector: str, stable_polls: int, table_selector: Optional[str] = None):
+        self.row_selector = row_selector
+        self.table_selector = table_selector
+        self.stable_polls = stable_polls
+        # None until rows, or an empty table, have been seen
+        self.last_count: Optional[int] = None
+        self.stable_for = 0
+        self.empty = False
+
+    def __call__(self, driver):
+        count = len(driver.find_elements(By.CSS_SELECTOR, self.row_selector))
+        if not count and not (self.table_selector and driver.find_elements(By.CSS_SELECTOR, self.table_selector)):
+            count = None
+        if count is not None and count == self.last_count:
+            self.stable_for += 1
+        else:
+            self.stable_for = 0
+        self.last_count = count
+        if self.stable_for < self.stable_polls:
+            return False
+        if count == 0:
+            self.empty = True
+            return True
+        return count
+
+
+def wait_for_rows(driver, source: str, row_selector: str,
+                  table_selector: Optional[str] = None,
+                  budget: Optional[float] = None,
+                  poll_interval: float = WAIT_POLL_INTERVAL,
+                  stable_polls: int = WAIT_STABLE_POLLS) -> int:
+    """
+    Poll until the calendar rows are rendered and the row count is stable.
+
+    If the budget runs out while rows are present but still changing, the
+    rows found so far are accepted. A table that stays on the page without
+    rows for `stable_polls` polls is an empty calendar, and 0 is returned
+    without waiting out the budget. If neither rows nor the table appear,
+    the selenium TimeoutException is raised.
+
+    Args:
+        driver: Selenium WebDriver
+        source: Key into SCRAPE_WAIT_CONFIG used for the default budget
+        row_selector: CSS selector matching the calendar rows
+        table_selector: CSS selector of the calendar table, checked while no
+            row is present
+        budget: Maximum number of seconds to wait
+        poll_interval: Seconds between polls
+        stable_polls: Consecutive polls with an unchanged row count
+
+    Returns:
+        Number of rows found
+    """
+    if budget is None:
+        budget = SCRAPE_WAIT_CONFIG[source]["budget"]
+
+    condition = _RowsStable(row_selector, stable_polls, table_selector)
+    try:
+        rows = WebDriverWait(driver, budget, poll_frequency=poll_interval).until(condition)
+    except TimeoutException:
+        if condition.last_count:
+            print(f"Row count for {source} still changing after {budget}s, using {condition.last_count} rows")
+            return condition.last_count
+        if table_selector and driver.find_elements(By.CSS_SELECTOR, table_selector):
+            print(f"Calendar table for {source} has no rows")
+            return 0
+        raise
+    if condition.empty:
+        print(f"Calendar table for {source} has no rows")
+        return 0
+    return rows